@@ -1,10 +1,14 @@
-import pandas as pd
+import csv
+import os
+import shutil
+import tempfile
 from pathlib import Path
 import re
 import argparse
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 INPUT_DIR = PROJECT_ROOT / "datastore/annotations/annotations_filtered"
+RESPONDENT_NAME_PATTERN = re.compile(r'^([A-Za-z]+)(\d+)')
 
 
 def increment_respondent_name(name):
@@ -12,7 +16,7 @@ def increment_respondent_name(name):
     Increment the number in a respondent name by 2.
     e.g., 'A1' -> 'A3', 'B4' -> 'B6'
     """
-    match = re.match(r'([A-Za-z]+)(\d+)', str(name))
+    match = RESPONDENT_NAME_PATTERN.match(str(name))
     if match:
         letter = match.group(1)
         number = int(match.group(2))
@@ -23,15 +27,38 @@ def increment_respondent_name(name):
 def process_csv_file(filepath):
     """
     Process a single CSV file, incrementing the 'Respondent Name' column.
+    Rows are streamed through the csv module into a temporary file that
+    then replaces the original, so other columns are written back untouched.
     """
-    df = pd.read_csv(filepath)
-    
-    if 'Respondent Name' in df.columns:
-        df['Respondent Name'] = df['Respondent Name'].apply(increment_respondent_name)
-        df.to_csv(filepath, index=False)
-        print(f"Processed: {filepath.name}")
-    else:
-        print(f"Warning: 'Respondent Name' column not found in {filepath.name}")
+    with open(filepath, newline='', encoding='utf-8-sig') as fin:
+        reader = csv.reader(fin)
+        header = next(reader, [])
+
+        if 'Respondent Name' not in header:
+            print(f"Warning: 'Respondent Name' column not found in {filepath.name}")
+            return
+
+        idx = header.index('Respondent Name')
+        fout = tempfile.NamedTemporaryFile(
+            'w', newline='', encoding='utf-8', dir=filepath.parent,
+            suffix='.csv', delete=False,
+        )
+        try:
+            with fout:
+                writer = csv.writer(fout, lineterminator='\n')
+                writer.writerow(header)
+                for row in reader:
+                    if idx < len(row):
+                        row[idx] = increment_respondent_name(row[idx])
+                    writer.writerow(row)
+            # NamedTemporaryFile is created 0600; keep the original's mode
+            shutil.copymode(filepath, fout.name)
+            os.replace(fout.name, filepath)
+        except BaseException:
+            os.unlink(fout.name)
+            raise
+
+    print(f"Processed: {filepath.name}")
 
 
 def main():
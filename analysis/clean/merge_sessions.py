@@ -6,6 +6,8 @@ Date: 2026-01-08
 
 import pandas as pd
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 
@@ -45,9 +47,13 @@ def verify_column_consistency(dataframes):
     if not dataframes:
         raise ValueError("No dataframes to verify")
     
-    base_columns = set(dataframes[0].columns)
+    base_order = tuple(dataframes[0].columns)
+    base_columns = set(base_order)
     
     for i, df in enumerate(dataframes[1:], start=1):
+        # Fast path: identical column order needs no set construction
+        if tuple(df.columns) == base_order:
+            continue
         current_columns = set(df.columns)
         if current_columns != base_columns:
             missing = base_columns - current_columns
@@ -65,21 +71,22 @@ def verify_column_consistency(dataframes):
 
 def check_merge_conflicts(dataframes, folder_names):
     """Check for potential merge conflicts."""
-    all_participant_codes = []
-    
-    for i, (df, folder) in enumerate(zip(dataframes, folder_names)):
-        codes = df['participant.code'].tolist()
-        all_participant_codes.extend([(code, folder) for code in codes])
-    
-    code_counts = {}
-    for code, folder in all_participant_codes:
-        if code not in code_counts:
-            code_counts[code] = []
-        code_counts[code].append(folder)
-    
-    conflicts = {code: folders for code, folders in code_counts.items() 
-                 if len(folders) > 1}
-    
+    # Raw per-session counts, so a code repeated within one session is
+    # reported as well as one shared between sessions
+    session_counts = [
+        df['participant.code'].value_counts(sort=False, dropna=False).to_dict()
+        for df in dataframes
+    ]
+    code_counts = Counter()
+    for counts in session_counts:
+        code_counts.update(counts)
+
+    conflicts = {
+        code: [folder for counts, folder in zip(session_counts, folder_names)
+               for _ in range(counts.get(code, 0))]
+        for code, count in code_counts.items() if count > 1
+    }
+
     if conflicts:
         print("⚠ WARNING: Duplicate participant codes found:")
         for code, folders in conflicts.items():
@@ -90,28 +97,38 @@ def check_merge_conflicts(dataframes, folder_names):
     return True
 
 
+def load_session_csv(folder_name):
+    """Load one session's CSV file and add its treatment column."""
+    folder_path = BASE_DIR / folder_name
+
+    if not folder_path.exists():
+        raise FileNotFoundError(f"Folder not found: {folder_path}")
+
+    csv_file = find_csv_file(folder_path)
+    df = pd.read_csv(csv_file, low_memory=False)
+
+    treatment = extract_treatment(folder_name)
+    df.insert(0, 'treatment', treatment)
+
+    return csv_file, df
+
+
 def load_and_prepare_data():
-    """Load all CSV files and add treatment column."""
+    """Load all CSV files in parallel and add treatment column."""
+    with ThreadPoolExecutor(max_workers=len(SESSION_FOLDERS)) as executor:
+        results = list(executor.map(load_session_csv, SESSION_FOLDERS))
+
     dataframes = []
     folder_names = []
-    
-    for folder_name in SESSION_FOLDERS:
-        folder_path = BASE_DIR / folder_name
-        
-        if not folder_path.exists():
-            raise FileNotFoundError(f"Folder not found: {folder_path}")
-        
-        csv_file = find_csv_file(folder_path)
-        df = pd.read_csv(csv_file)
-        
-        treatment = extract_treatment(folder_name)
-        df.insert(0, 'treatment', treatment)
-        
+
+    # executor.map preserves SESSION_FOLDERS order
+    for folder_name, (csv_file, df) in zip(SESSION_FOLDERS, results):
         dataframes.append(df)
         folder_names.append(folder_name)
-        
+
+        treatment = extract_treatment(folder_name)
         print(f"Loaded {csv_file.name}: {len(df)} rows, treatment {treatment}")
-    
+
     return dataframes, folder_names
 
 
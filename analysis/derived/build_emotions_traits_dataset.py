@@ -18,8 +18,14 @@ OUTPUT VARIABLES:
 """
 
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from .group_ids import format_global_group_ids
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from group_ids import format_global_group_ids
+
 # =====
 # File paths
 # =====
@@ -39,9 +45,7 @@ OUTPUT_PATH = DERIVED / "emotions_traits_selling_dataset.csv"
 def main():
     """Merge all three datasets and save."""
     print("Loading datasets...")
-    period_df = pd.read_csv(INPUT_PERIOD)
-    traits_df = pd.read_csv(INPUT_TRAITS)
-    emotions_df = pd.read_csv(INPUT_EMOTIONS)
+    period_df, traits_df, emotions_df = load_datasets()
 
     print(f"  Period data: {len(period_df)} rows")
     print(f"  Traits data: {len(traits_df)} rows")
@@ -57,9 +61,29 @@ def main():
     return merged
 
 
+# =====
+# Loading
+# =====
+def load_datasets() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Read the period, traits, and emotions CSVs concurrently."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        period = executor.submit(pd.read_csv, INPUT_PERIOD)
+        traits = executor.submit(
+            pd.read_csv, INPUT_TRAITS, usecols=TRAIT_COLS, dtype=KEY_DTYPES,
+        )
+        emotions = executor.submit(
+            pd.read_csv, INPUT_EMOTIONS, usecols=EMOTION_COLS, dtype=KEY_DTYPES,
+        )
+        return period.result(), traits.result(), emotions.result()
+
+
 # =====
 # Merge logic
 # =====
+# Only the merged columns are parsed from the traits and emotions files;
+# string keys are pinned so pandas does not infer them per file
+KEY_DTYPES = {"session_id": str, "player": str}
+
 TRAIT_COLS = [
     "session_id", "player", "extraversion", "agreeableness",
     "conscientiousness", "neuroticism", "openness",
@@ -68,7 +92,7 @@ TRAIT_COLS = [
 
 # NOTE: period values in emotions_df are already aligned to oTree period numbering.
 # The offset (iMotions m{N} -> oTree period N-1) is applied upstream in
-# build_imotions_period_emotions.py::parse_market_period_annotation(), so merge
+# build_imotions_period_emotions.py::parse_market_period_annotations(), so merge
 # keys match correctly between oTree selling data and iMotions emotion data.
 EMOTION_COLS = [
     "session_id", "segment", "round", "period", "player",
@@ -91,29 +115,23 @@ def merge_datasets(
 
 def merge_traits(period_df: pd.DataFrame, traits_df: pd.DataFrame) -> pd.DataFrame:
     """Left-join player-level traits onto the period dataset."""
-    return period_df.merge(
-        traits_df[TRAIT_COLS],
-        on=["session_id", "player"],
-        how="left",
+    keys = ["session_id", "player"]
+    return period_df.join(
+        traits_df[TRAIT_COLS].set_index(keys), on=keys, how="left",
     )
 
 
 def merge_emotions(merged: pd.DataFrame, emotions_df: pd.DataFrame) -> pd.DataFrame:
     """Left-join period-level emotions onto the merged dataset."""
-    return merged.merge(
-        emotions_df[EMOTION_COLS],
-        on=["session_id", "segment", "round", "period", "player"],
-        how="left",
+    keys = ["session_id", "segment", "round", "period", "player"]
+    return merged.join(
+        emotions_df[EMOTION_COLS].set_index(keys), on=keys, how="left",
     )
 
 
 def add_global_group_id(df: pd.DataFrame) -> pd.DataFrame:
     """Add unique group identifier across sessions and segments."""
-    df["global_group_id"] = (
-        df["session_id"].astype(str) + "_"
-        + df["segment"].astype(str) + "_"
-        + df["group_id"].astype(str)
-    )
+    df["global_group_id"] = format_global_group_ids(df)
     return df
 
 
@@ -129,30 +147,32 @@ REPORT_COLS = [
 def print_merge_report(merged: pd.DataFrame, original: pd.DataFrame):
     """Report merge quality metrics."""
     n_total = len(merged)
+    # One NaN reduction feeds both the coverage and NaN count sections
+    nan_counts = merged[REPORT_COLS].isna().sum()
     print("\n" + "=" * 50)
     print("MERGE REPORT")
     print("=" * 50)
     print(f"Total rows: {n_total} (original: {len(original)})")
-    print_coverage(merged, n_total)
-    print_nan_counts(merged)
+    print_coverage(nan_counts, n_total)
+    print_nan_counts(nan_counts)
     print_session_summary(merged)
 
 
-def print_coverage(merged: pd.DataFrame, n_total: int):
+def print_coverage(nan_counts: pd.Series, n_total: int):
     """Print trait and emotion match rates."""
-    trait_matched = merged["extraversion"].notna().sum()
-    emotion_matched = merged["anger_mean"].notna().sum()
+    trait_matched = n_total - nan_counts["extraversion"]
+    emotion_matched = n_total - nan_counts["anger_mean"]
     print(f"\nTraits coverage: {trait_matched}/{n_total} "
           f"({trait_matched / n_total * 100:.1f}%)")
     print(f"Emotions coverage: {emotion_matched}/{n_total} "
           f"({emotion_matched / n_total * 100:.1f}%)")
 
 
-def print_nan_counts(merged: pd.DataFrame):
+def print_nan_counts(nan_counts: pd.Series):
     """Print NaN count for each key column."""
     print("\nNaN counts:")
-    for col in REPORT_COLS:
-        print(f"  {col}: {merged[col].isna().sum()}")
+    for col, count in nan_counts.items():
+        print(f"  {col}: {count}")
 
 
 def print_session_summary(merged: pd.DataFrame):
@@ -10,6 +10,11 @@ Creates a group-round level dataset with signal at first sale for regression:
 import pandas as pd
 from pathlib import Path
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # =====
 # File paths
 # =====
@@ -29,23 +34,32 @@ SESSIONS = {
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
 
+# Columns needed to find each group-round's first sale and the signal then
+SEGMENT_COLS = [
+    "group.id_in_subsession",
+    "player.round_number_in_segment",
+    "player.period_in_round",
+    "player.sold",
+    "player.signal",
+]
+
 
 # =====
 # Main function
 # =====
 def main():
     """Build the first sale dataset."""
-    all_records = []
+    frames = []
 
     print("Processing sessions...")
-    for session_name, treatment in SESSIONS.items():
+    results = map_sessions(process_session, SESSIONS.keys(), SESSIONS.values())
+    for (session_name, treatment), session_df in zip(SESSIONS.items(), results):
         print(f"  {session_name} (treatment {treatment})")
-        records = process_session(session_name, treatment)
-        all_records.extend(records)
-        print(f"    -> {len(records)} group-round observations")
+        frames.append(session_df)
+        print(f"    -> {len(session_df)} group-round observations")
 
-    # Create DataFrame
-    df = pd.DataFrame(all_records)
+    # Combine per-session DataFrames
+    df = pd.concat(frames, ignore_index=True)
 
     # Summary statistics
     print("\n" + "=" * 50)
@@ -70,8 +84,8 @@ def main():
 # =====
 # Session processing
 # =====
-def process_session(session_name: str, treatment: int) -> list[dict]:
-    """Process all segments for a session, return list of group-round records."""
+def process_session(session_name: str, treatment: int) -> pd.DataFrame:
+    """Process all segments for a session, return DataFrame of group-round records."""
     session_folder = DATASTORE / session_name
     records = []
 
@@ -106,7 +120,7 @@ def process_session(session_name: str, treatment: int) -> list[dict]:
                 "n_sellers_first_period": first_sale_info["n_sellers_first_period"],
             })
 
-    return records
+    return pd.DataFrame(records)
 
 
 # =====
@@ -114,10 +128,10 @@ def process_session(session_name: str, treatment: int) -> list[dict]:
 # =====
 def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
     """Load segment CSV file from session folder."""
-    csv_files = list(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
     if not csv_files:
         raise FileNotFoundError(f"No CSV found for {segment} in {session_folder}")
-    return pd.read_csv(csv_files[0])
+    return pd.read_csv(csv_files[0], usecols=SEGMENT_COLS)
 
 
 def get_first_sale_for_group_round(df: pd.DataFrame) -> dict:
@@ -129,10 +143,13 @@ def get_first_sale_for_group_round(df: pd.DataFrame) -> dict:
         - signal_at_first_sale: signal value at first sale
         - n_sellers_first_period: how many sold in that first period
     """
-    # Filter to rows where someone sold this period
-    sales = df[df["player.sold"] == 1].copy()
+    periods = df["player.period_in_round"].to_numpy()
+    signals = df["player.signal"].to_numpy()
+
+    # Rows where someone sold this period
+    sold = df["player.sold"].to_numpy() == 1
 
-    if sales.empty:
+    if not sold.any():
         return {
             "first_sale_period": None,
             "signal_at_first_sale": None,
@@ -140,12 +157,12 @@ def get_first_sale_for_group_round(df: pd.DataFrame) -> dict:
         }
 
     # Find the minimum period where a sale occurred
-    first_sale_period = sales["player.period_in_round"].min()
+    first_sale_period = periods[sold].min()
 
     # Get signal at first sale (all players share same signal, take first)
-    first_sale_rows = sales[sales["player.period_in_round"] == first_sale_period]
-    signal_at_first_sale = first_sale_rows["player.signal"].iloc[0]
-    n_sellers = len(first_sale_rows)
+    first_sale_rows = sold & (periods == first_sale_period)
+    signal_at_first_sale = signals[first_sale_rows][0]
+    n_sellers = int(first_sale_rows.sum())
 
     return {
         "first_sale_period": first_sale_period,
@@ -95,11 +95,10 @@ def merge_datasets(first_seller_df: pd.DataFrame, traits_df: pd.DataFrame) -> pd
     rows_before = len(first_seller_df)
 
     # Inner join drops rows without matching traits
-    merged = first_seller_df.merge(
-        traits_df,
-        on=["session_id", "player"],
-        how="inner"
-    )
+    keys = ["session_id", "player"]
+    merged = first_seller_df.join(
+        traits_df.set_index(keys), on=keys, how="inner"
+    ).reset_index(drop=True)
 
     rows_dropped = rows_before - len(merged)
     print(f"  Rows before merge: {rows_before}")
@@ -133,15 +132,15 @@ def validate_dataset(df: pd.DataFrame):
     ]
 
     print("\nValidation:")
-    missing_traits = df[trait_cols].isna().sum()
-    has_missing = missing_traits.sum() > 0
+    missing = df[trait_cols].isna().to_numpy()
 
-    if has_missing:
+    # Per-column counts are only needed on the failure path
+    if missing.any():
         print("  Missing values in trait columns:")
-        for col, count in missing_traits.items():
+        for col, count in zip(trait_cols, missing.sum(axis=0)):
             if count > 0:
                 print(f"    {col}: {count}")
-        assert False, f"Missing trait values: {int(missing_traits.sum())}"
+        assert False, f"Missing trait values: {int(missing.sum())}"
     else:
         print("  OK: No missing values in trait columns")
 
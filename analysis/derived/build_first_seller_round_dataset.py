@@ -32,6 +32,11 @@ DATA STRUCTURE:
 import pandas as pd
 from pathlib import Path
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # =====
 # File paths
 # =====
@@ -51,22 +56,41 @@ SESSIONS = {
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
 
+# Columns needed to flag first sellers and record the public signal and state
+SEGMENT_COLS = [
+    "group.id_in_subsession",
+    "player.round_number_in_segment",
+    "player.period_in_round",
+    "participant.label",
+    "player.sold",
+    "player.signal",
+    "player.state",
+]
+
+GROUP_ROUND_KEYS = ["group.id_in_subsession", "player.round_number_in_segment"]
+
+NO_FIRST_SALE = {
+    "first_sale_period": None,
+    "public_signal": None,
+    "first_sellers": frozenset(),
+}
+
 
 # =====
 # Main function
 # =====
 def main():
     """Build the first seller round dataset."""
-    all_records = []
+    frames = []
 
     print("Processing sessions...")
-    for session_name, treatment in SESSIONS.items():
+    results = map_sessions(process_session, SESSIONS.keys(), SESSIONS.values())
+    for (session_name, treatment), session_df in zip(SESSIONS.items(), results):
         print(f"  {session_name} (treatment {treatment})")
-        records = process_session(session_name, treatment)
-        all_records.extend(records)
-        print(f"    -> {len(records)} player-round observations")
+        frames.append(session_df)
+        print(f"    -> {len(session_df)} player-round observations")
 
-    df = pd.DataFrame(all_records)
+    df = pd.concat(frames, ignore_index=True)
     print_summary_statistics(df)
     save_dataset(df)
 
@@ -76,8 +100,8 @@ def main():
 # =====
 # Session processing
 # =====
-def process_session(session_name: str, treatment: str) -> list[dict]:
-    """Process all segments for a session, return list of player-round records."""
+def process_session(session_name: str, treatment: str) -> pd.DataFrame:
+    """Process all segments for a session, return DataFrame of player-round records."""
     session_folder = DATASTORE / session_name
     records = []
 
@@ -91,7 +115,7 @@ def process_session(session_name: str, treatment: str) -> list[dict]:
         segment_records = process_segment(df, session_name, segment_idx, treatment)
         records.extend(segment_records)
 
-    return records
+    return pd.DataFrame(records)
 
 
 def process_segment(
@@ -102,15 +126,15 @@ def process_segment(
 ) -> list[dict]:
     """Process all group-rounds in a segment."""
     records = []
+    first_sales = summarize_first_sales(df)
 
-    group_rounds = df.groupby(
-        ["group.id_in_subsession", "player.round_number_in_segment"]
-    )
+    group_rounds = df.groupby(GROUP_ROUND_KEYS)
 
     for (group_id, round_num), group_df in group_rounds:
+        key = (int(group_id), int(round_num))
         round_records = process_group_round(
-            group_df, session_name, segment_idx, int(group_id),
-            int(round_num), treatment
+            group_df, session_name, segment_idx, key[0], key[1], treatment,
+            first_sale_info=first_sales.get(key, NO_FIRST_SALE),
         )
         records.extend(round_records)
 
@@ -122,7 +146,7 @@ def process_segment(
 # =====
 def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
     """Load segment CSV file from session folder."""
-    csv_files = sorted(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
     if not csv_files:
         raise FileNotFoundError(f"No CSV found for {segment} in {session_folder}")
     if len(csv_files) > 1:
@@ -130,7 +154,7 @@ def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
             f"Multiple CSVs found for {segment} in {session_folder}: "
             f"{[f.name for f in csv_files]}. Expected exactly one."
         )
-    return pd.read_csv(csv_files[0])
+    return pd.read_csv(csv_files[0], usecols=SEGMENT_COLS)
 
 
 # =====
@@ -142,14 +166,17 @@ def process_group_round(
     segment_idx: int,
     group_id: int,
     round_num: int,
-    treatment: str
+    treatment: str,
+    first_sale_info: dict,
 ) -> list[dict]:
-    """Process a single group-round and return player-round records."""
+    """Process a single group-round and return player-round records.
+
+    first_sale_info is this group-round's entry from summarize_first_sales
+    (NO_FIRST_SALE if nobody sold).
+    """
     players = group_df["participant.label"].unique()
-    state = int(group_df["player.state"].iloc[0])
+    state = int(group_df["player.state"].to_numpy()[0])
 
-    # Find first sale info for this group-round
-    first_sale_info = find_first_sale_info(group_df)
     first_sale_period = first_sale_info["first_sale_period"]
     public_signal = first_sale_info["public_signal"]
     first_sellers = first_sale_info["first_sellers"]
@@ -174,83 +201,44 @@ def process_group_round(
     return records
 
 
-def find_first_sale_info(group_df: pd.DataFrame) -> dict:
+def summarize_first_sales(df: pd.DataFrame) -> dict:
     """
-    Find info about the first sale(s) in a group-round.
+    Find first sale info for every group-round in a segment at once.
 
-    Returns dict with:
-        - first_sale_period: period when first sale occurred (None if no sales)
-        - public_signal: signal value at first sale (None if no sales)
-        - first_sellers: set of player labels who sold in the first sale period
+    Returns dict mapping (group_id, round_num) -> dict with:
+        - first_sale_period: earliest period in which anyone sold
+        - public_signal: signal value at that period (first row)
+        - first_sellers: set of player labels who sold in that period
+    Group-rounds without sales are omitted; callers use NO_FIRST_SALE.
     """
-    # Build lookup of when each player sold
-    players_with_sales = find_sellers_by_period(group_df)
-
-    if not players_with_sales:
-        return {
-            "first_sale_period": None,
-            "public_signal": None,
-            "first_sellers": set(),
-        }
-
-    # Find minimum period where any sale occurred
-    first_sale_period = min(players_with_sales.values())
-
-    # Find all players who sold in that first period
-    first_sellers = {
-        player for player, period in players_with_sales.items()
-        if period == first_sale_period
-    }
-
-    # Get the public signal at the first sale period
-    first_period_rows = group_df[
-        group_df["player.period_in_round"] == first_sale_period
-    ]
-    public_signal = first_period_rows["player.signal"].iloc[0]
+    sold = df["player.sold"] == 1
+    periods = df["player.period_in_round"]
+    first_period = periods.where(sold).groupby(
+        [df[key] for key in GROUP_ROUND_KEYS]
+    ).transform("min")
+    at_first_period = periods == first_period
+
+    # Public signal is taken from the first row in the first sale period
+    first_rows = df.loc[at_first_period].drop_duplicates(GROUP_ROUND_KEYS)
+    first_sellers = df.loc[at_first_period & sold].groupby(GROUP_ROUND_KEYS)[
+        "participant.label"
+    ].agg(set)
 
     return {
-        "first_sale_period": first_sale_period,
-        "public_signal": public_signal,
-        "first_sellers": first_sellers,
+        (int(group_id), int(round_num)): {
+            "first_sale_period": int(period),
+            "public_signal": signal,
+            "first_sellers": first_sellers[(group_id, round_num)],
+        }
+        for group_id, round_num, period, signal in zip(
+            first_rows["group.id_in_subsession"],
+            first_rows["player.round_number_in_segment"],
+            first_rows["player.period_in_round"],
+            first_rows["player.signal"],
+        )
     }
 
 
-def find_sellers_by_period(group_df: pd.DataFrame) -> dict:
-    """
-    Find which period each player sold in (if they sold).
-
-    Returns dict mapping player label -> sell period (only includes sellers).
-    """
-    sellers = {}
-    players = group_df["participant.label"].unique()
-
-    for player in players:
-        player_df = group_df[group_df["participant.label"] == player]
-        sell_period = get_player_sell_period(player_df)
-        if sell_period is not None:
-            sellers[player] = sell_period
-
-    return sellers
-
-
-def get_player_sell_period(player_df: pd.DataFrame) -> int | None:
-    """
-    Find which period a player sold in.
-
-    Returns period number when player sold, or None if never sold.
-    """
-    sorted_df = player_df.sort_values("player.period_in_round")
-    prev_sold = 0
-
-    for _, row in sorted_df.iterrows():
-        current_sold = int(row["player.sold"]) if pd.notna(row["player.sold"]) else 0
-        if current_sold == 1 and prev_sold == 0:
-            return int(row["player.period_in_round"])
-        prev_sold = current_sold
-
-    return None
-
-
 # =====
 # Output functions
 # =====
@@ -11,6 +11,11 @@ import pandas as pd
 from pathlib import Path
 from typing import Optional
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # =====
 # File paths
 # =====
@@ -29,7 +34,27 @@ SESSIONS = {
 }
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
+
+# Columns needed to order each group-round's sellers by period, then label
+SEGMENT_COLS = [
+    "group.id_in_subsession",
+    "player.round_number_in_segment",
+    "player.period_in_round",
+    "player.id_in_group",
+    "participant.label",
+    "player.sold",
+    "player.signal",
+    "player.state",
+]
+
 PRICES = [8, 6, 4, 2]
+MAX_SELLERS = 4
+SELLER_FIELDS = ("period", "label", "signal")
+SELLER_COLUMNS = tuple(
+    f"seller_{i}_{field}"
+    for i in range(1, MAX_SELLERS + 1)
+    for field in SELLER_FIELDS
+)
 
 
 # =====
@@ -37,16 +62,16 @@ PRICES = [8, 6, 4, 2]
 # =====
 def main():
     """Build the group-round timing dataset."""
-    all_records = []
+    frames = []
 
     print("Processing sessions...")
-    for session_name, treatment in SESSIONS.items():
+    results = map_sessions(process_session, SESSIONS.keys(), SESSIONS.values())
+    for (session_name, treatment), session_df in zip(SESSIONS.items(), results):
         print(f"  {session_name} (treatment {treatment})")
-        records = process_session(session_name, treatment)
-        all_records.extend(records)
-        print(f"    -> {len(records)} group-round observations")
+        frames.append(session_df)
+        print(f"    -> {len(session_df)} group-round observations")
 
-    df = pd.DataFrame(all_records)
+    df = pd.concat(frames, ignore_index=True)
     print_summary_statistics(df)
     save_dataset(df)
 
@@ -56,8 +81,8 @@ def main():
 # =====
 # Session processing
 # =====
-def process_session(session_name: str, treatment: int) -> list[dict]:
-    """Process all segments for a session, return list of group-round records."""
+def process_session(session_name: str, treatment: int) -> pd.DataFrame:
+    """Process all segments for a session, return DataFrame of group-round records."""
     session_folder = DATASTORE / session_name
     records = []
 
@@ -73,7 +98,7 @@ def process_session(session_name: str, treatment: int) -> list[dict]:
         )
         records.extend(segment_records)
 
-    return records
+    return pd.DataFrame(records)
 
 
 def process_segment(
@@ -110,7 +135,7 @@ def build_group_round_record(
 ) -> dict:
     """Build a single group-round record with seller timing."""
     sellers = get_sellers_with_timing(group_df)
-    state = group_df["player.state"].iloc[0]
+    state = group_df["player.state"].to_numpy()[0]
     global_group_id = f"{session_name}_seg{segment_idx}_g{group_id}"
 
     record = {
@@ -126,17 +151,11 @@ def build_group_round_record(
         "welfare": compute_welfare(int(state), len(sellers)),
     }
 
-    # Add seller columns (up to 4 sellers)
-    for i in range(4):
-        seller_num = i + 1
-        if i < len(sellers):
-            record[f"seller_{seller_num}_period"] = sellers[i]["period"]
-            record[f"seller_{seller_num}_label"] = sellers[i]["label"]
-            record[f"seller_{seller_num}_signal"] = sellers[i]["signal"]
-        else:
-            record[f"seller_{seller_num}_period"] = None
-            record[f"seller_{seller_num}_label"] = None
-            record[f"seller_{seller_num}_signal"] = None
+    # Seller columns default to None; fill slots for actual sellers (up to 4)
+    record.update(dict.fromkeys(SELLER_COLUMNS))
+    for seller_num, seller in enumerate(sellers[:MAX_SELLERS], start=1):
+        for field in SELLER_FIELDS:
+            record[f"seller_{seller_num}_{field}"] = seller[field]
 
     return record
 
@@ -171,34 +190,28 @@ def get_sellers_with_timing(df: pd.DataFrame) -> list[dict]:
 
     Returns list of dicts with keys: period, label, signal
     """
-    sales = df[df["player.sold"] == 1].copy()
+    sales = df.loc[
+        df["player.sold"] == 1,
+        ["player.id_in_group", "player.period_in_round",
+         "participant.label", "player.signal"],
+    ]
 
     if sales.empty:
         return []
 
-    # Find minimum period for each player who sold
-    seller_info = find_seller_info(sales)
-
-    # Sort by period, then by label
-    seller_info.sort(key=lambda x: (x["period"], x["label"]))
-
-    return seller_info
-
-
-def find_seller_info(sales_df: pd.DataFrame) -> list[dict]:
-    """Extract period, label, and signal for each seller."""
-    sellers = []
-    grouped = sales_df.groupby("player.id_in_group")
-
-    for _, player_sales in grouped:
-        first_sale = player_sales.loc[player_sales["player.period_in_round"].idxmin()]
-        sellers.append({
-            "period": int(first_sale["player.period_in_round"]),
-            "label": first_sale["participant.label"],
-            "signal": first_sale["player.signal"],
-        })
-
-    return sellers
+    # After sorting, each player's first row is their earliest sale
+    first_sales = sales.sort_values(
+        ["player.period_in_round", "participant.label"], kind="stable"
+    ).drop_duplicates("player.id_in_group")
+
+    return [
+        {"period": int(period), "label": label, "signal": signal}
+        for period, label, signal in zip(
+            first_sales["player.period_in_round"],
+            first_sales["participant.label"],
+            first_sales["player.signal"],
+        )
+    ]
 
 
 # =====
@@ -206,7 +219,7 @@ def find_seller_info(sales_df: pd.DataFrame) -> list[dict]:
 # =====
 def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
     """Load segment CSV file from session folder."""
-    csv_files = sorted(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
     if not csv_files:
         raise FileNotFoundError(f"No CSV found for {segment} in {session_folder}")
     if len(csv_files) > 1:
@@ -214,7 +227,7 @@ def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
             f"Multiple CSVs found for {segment} in {session_folder}: "
             f"{[f.name for f in csv_files]}. Expected exactly one."
         )
-    return pd.read_csv(csv_files[0])
+    return pd.read_csv(csv_files[0], usecols=SEGMENT_COLS)
 
 
 # =====
@@ -11,12 +11,23 @@ in the following round.
 from pathlib import Path
 import pandas as pd
 
+try:
+    from .group_ids import format_global_group_ids
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from group_ids import format_global_group_ids
+
 # FILE PATHS
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DATASTORE = PROJECT_ROOT / "datastore"
 INPUT_PATH = DATASTORE / "derived" / "individual_period_dataset_extended.csv"
 OUTPUT_PATH = DATASTORE / "derived" / "holdout_next_round_analysis.csv"
 
+# Columns of the period dataset used anywhere in this script
+INPUT_COLS = [
+    "session_id", "segment", "round", "period", "player", "group_id",
+    "treatment", "state", "signal", "sold_in_round", "round_payoff",
+]
+
 
 # =====
 # Main function
@@ -24,7 +35,7 @@ OUTPUT_PATH = DATASTORE / "derived" / "holdout_next_round_analysis.csv"
 def main():
     """Build the holdout next-round analysis dataset."""
     print(f"Loading dataset from: {INPUT_PATH}")
-    df = pd.read_csv(INPUT_PATH)
+    df = pd.read_csv(INPUT_PATH, usecols=INPUT_COLS)
     print(f"Loaded {len(df)} rows")
 
     df_holdouts = filter_to_holdouts(df)
@@ -55,7 +66,7 @@ def filter_to_holdouts(df: pd.DataFrame) -> pd.DataFrame:
         (df["state"] == 0) &
         (df["sold_in_round"] == 0)
     )
-    df_holdouts = df[mask].copy()
+    df_holdouts = df[mask]
     print(f"Filtered to {len(df_holdouts)} holdout period-observations")
     return df_holdouts
 
@@ -71,8 +82,11 @@ def aggregate_to_round_level(df: pd.DataFrame) -> pd.DataFrame:
     we just take the first row for each group.
     """
     group_cols = ["session_id", "segment", "round", "player", "group_id"]
-    df_round = df.groupby(group_cols).first().reset_index()
-    df_round = df_round[group_cols + ["round_payoff"]]
+    df_round = (
+        df.drop_duplicates(subset=group_cols)[group_cols + ["round_payoff"]]
+        .sort_values(group_cols)
+        .reset_index(drop=True)
+    )
     print(f"Aggregated to {len(df_round)} holdout round-observations")
     return df_round
 
@@ -83,11 +97,7 @@ def aggregate_to_round_level(df: pd.DataFrame) -> pd.DataFrame:
 def add_identifiers(df: pd.DataFrame) -> pd.DataFrame:
     """Add global_round and global_group_id columns."""
     df["global_round"] = (df["segment"] - 1) * 14 + df["round"]
-    df["global_group_id"] = (
-        df["session_id"] + "_" +
-        df["segment"].astype(str) + "_" +
-        df["group_id"].astype(str)
-    )
+    df["global_group_id"] = format_global_group_ids(df)
     return df
 
 
@@ -106,9 +116,8 @@ def link_next_round_behavior(
     # Build lookup for next round data
     next_round_data = build_next_round_lookup(df_full)
 
-    # Create next round key for each holdout
-    df_holdouts = df_holdouts.copy()
-    df_holdouts["next_round"] = df_holdouts["round"] + 1
+    # Create next round key for each holdout (assign leaves the input intact)
+    df_holdouts = df_holdouts.assign(next_round=df_holdouts["round"] + 1)
 
     # Merge to get next round behavior
     df_merged = df_holdouts.merge(
@@ -131,10 +140,10 @@ def build_next_round_lookup(df: pd.DataFrame) -> pd.DataFrame:
     Signal from period 1 is always 0.5 (prior before any private signals).
     This serves as a baseline/placeholder for the next round signal.
     """
-    df_tr1 = df[df["treatment"] == "tr1"].copy()
+    df_tr1 = df[df["treatment"] == "tr1"]
 
     # Get first period of each round (period 1)
-    period_1 = df_tr1[df_tr1["period"] == 1].copy()
+    period_1 = df_tr1[df_tr1["period"] == 1]
     result = period_1[
         ["session_id", "segment", "round", "player", "sold_in_round", "signal"]
     ].drop_duplicates()
@@ -177,7 +186,7 @@ def build_sales_history(df: pd.DataFrame) -> pd.DataFrame:
     prior_sales = cumulative count of rounds with sold_in_round=1 BEFORE current.
     """
     # Get one row per round with sold_in_round
-    df_tr1 = df[df["treatment"] == "tr1"].copy()
+    df_tr1 = df[df["treatment"] == "tr1"]
     round_sales = df_tr1.groupby(
         ["session_id", "segment", "round", "player"]
     )["sold_in_round"].first().reset_index()
@@ -192,11 +201,11 @@ def build_sales_history(df: pd.DataFrame) -> pd.DataFrame:
         ["session_id", "player", "global_round"]
     )
 
-    # Compute cumsum then shift within each player group
-    # shift(1) moves values down, so each row gets the cumsum from prior rounds
-    round_sales["prior_sales"] = round_sales.groupby(
+    # Cumsum within each player, minus the current round, counts prior rounds
+    cumulative_sales = round_sales.groupby(
         ["session_id", "player"]
-    )["sold_in_round"].transform(lambda x: x.cumsum().shift(1, fill_value=0))
+    )["sold_in_round"].cumsum()
+    round_sales["prior_sales"] = cumulative_sales - round_sales["sold_in_round"]
 
     return round_sales[["session_id", "segment", "round", "player", "prior_sales"]]
 
@@ -13,7 +13,7 @@ IMOTIONS PERIOD OFFSET:
         - m2 -> period 1
         - m3 -> period 2
         - etc.
-    The offset is applied in `parse_market_period_annotation()` so that downstream
+    The offset is applied in `parse_market_period_annotations()` so that downstream
     datasets use oTree-aligned period values.
 
 OUTPUT VARIABLES:
@@ -30,6 +30,8 @@ OUTPUT VARIABLES:
 
 import re
 import pandas as pd
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 # =====
@@ -57,6 +59,7 @@ EMOTION_COLS = [
 
 ANNOTATION_COL = "Respondent Annotations active"
 MARKET_PERIOD_REGEX = re.compile(r"^s(\d+)r(\d+)m(\d+)MarketPeriod$")
+PLAYER_FILE_REGEX = re.compile(r"\d+_([A-Z])\d+\.csv")
 
 # Number of metadata rows to skip in iMotions CSV files
 IMOTIONS_SKIP_ROWS = 24
@@ -67,17 +70,19 @@ IMOTIONS_SKIP_ROWS = 24
 # =====
 def main():
     """Build the period-level emotions dataset."""
-    all_records = []
+    frames = []
 
     print("Processing iMotions data...")
-    for imotions_session, session_id in IMOTIONS_SESSION_MAP.items():
-        print(f"  Session {imotions_session} ({session_id})")
-        session_dir = IMOTIONS_DIR / imotions_session
-        records = process_session(session_dir, session_id)
-        all_records.extend(records)
-        print(f"    -> {len(records)} period-level observations")
-
-    df = pd.DataFrame(all_records)
+    # Participant files are independent; parse them across worker processes
+    with ProcessPoolExecutor() as executor:
+        for imotions_session, session_id in IMOTIONS_SESSION_MAP.items():
+            print(f"  Session {imotions_session} ({session_id})")
+            session_dir = IMOTIONS_DIR / imotions_session
+            session_df = process_session(session_dir, session_id, executor)
+            frames.append(session_df)
+            print(f"    -> {len(session_df)} period-level observations")
+
+    df = pd.concat(frames, ignore_index=True)
     print_summary(df)
     save_dataset(df)
 
@@ -87,10 +92,15 @@ def main():
 # =====
 # Session and file processing
 # =====
-def process_session(session_dir: Path, session_id: str) -> list[dict]:
-    """Process all participant files in an iMotions session directory."""
-    records = []
+def process_session(
+    session_dir: Path, session_id: str, executor: Executor | None = None
+) -> pd.DataFrame:
+    """Process all participant files in an iMotions session directory.
+
+    Files are processed with executor.map when an executor is given.
+    """
     csv_files = sorted(session_dir.glob("*.csv"))
+    participant_files = []
 
     for csv_file in csv_files:
         if csv_file.name == "ExportMerge.csv":
@@ -101,15 +111,25 @@ def process_session(session_dir: Path, session_id: str) -> list[dict]:
             print(f"    Warning: Could not extract label from {csv_file.name}")
             continue
 
-        file_records = process_participant_file(csv_file, session_id, player_label)
-        records.extend(file_records)
+        participant_files.append((csv_file, player_label))
 
-    return records
+    map_fn = executor.map if executor is not None else map
+    file_dfs = map_fn(
+        process_participant_file,
+        [csv_file for csv_file, _ in participant_files],
+        repeat(session_id, len(participant_files)),
+        [label for _, label in participant_files],
+    )
+    frames = [file_df for file_df in file_dfs if not file_df.empty]
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
 
 def extract_player_label(filename: str) -> str | None:
     """Extract participant letter from filename pattern {order}_{letter}{suffix}.csv."""
-    match = re.match(r"\d+_([A-Z])\d+\.csv", filename)
+    match = PLAYER_FILE_REGEX.match(filename)
     if match:
         return match.group(1)
     return None
@@ -117,28 +137,26 @@ def extract_player_label(filename: str) -> str | None:
 
 def process_participant_file(
     filepath: Path, session_id: str, player_label: str
-) -> list[dict]:
+) -> pd.DataFrame:
     """Load one iMotions CSV and aggregate emotions by period."""
     df = pd.read_csv(
         filepath,
         skiprows=IMOTIONS_SKIP_ROWS,
         encoding="utf-8-sig",
+        usecols=[ANNOTATION_COL] + EMOTION_COLS,
         low_memory=False,
     )
 
     # Parse annotation column to identify MarketPeriod rows
-    parsed = df[ANNOTATION_COL].apply(parse_market_period_annotation)
-    mask = parsed.notna()
-    market_df = df[mask].copy()
+    parsed = parse_market_period_annotations(df[ANNOTATION_COL])
 
-    if market_df.empty:
-        return []
+    if parsed.empty:
+        return pd.DataFrame()
 
     # Attach parsed segment, round, period columns
-    parsed_data = parsed[mask].apply(pd.Series)
-    parsed_data.columns = ["segment", "round", "period"]
     market_df = pd.concat(
-        [market_df.reset_index(drop=True), parsed_data.reset_index(drop=True)],
+        [df.loc[parsed.index].reset_index(drop=True),
+         parsed.reset_index(drop=True)],
         axis=1,
     )
 
@@ -148,22 +166,15 @@ def process_participant_file(
 # =====
 # Annotation parsing
 # =====
-def parse_market_period_annotation(annotation) -> tuple | None:
+def parse_market_period_annotations(annotations: pd.Series) -> pd.DataFrame:
     """
-    Parse a MarketPeriod annotation string into (segment, round, period).
+    Parse a MarketPeriod annotation column into segment, round, period columns.
 
-    Returns None for non-MarketPeriod annotations.
+    Only MarketPeriod rows are returned, indexed like the input.
     """
-    if pd.isna(annotation):
-        return None
-
-    match = MARKET_PERIOD_REGEX.match(str(annotation))
-    if not match:
-        return None
-
-    segment = int(match.group(1))
-    round_num = int(match.group(2))
-    m_value = int(match.group(3))
+    parsed = annotations.astype(str).str.extract(MARKET_PERIOD_REGEX).dropna()
+    parsed = parsed.astype(int)
+    parsed.columns = ["segment", "round", "period"]
 
     # OFFSET EXPLANATION:
     # The iMotions annotation generator (`generate_annotations_unfiltered_v2.py`)
@@ -174,9 +185,14 @@ def parse_market_period_annotation(annotation) -> tuple | None:
     #   - m4 -> period 3
     # We apply this offset here so all downstream datasets (imotions_period_emotions.csv,
     # emotions_traits_selling_dataset.csv) align with oTree period numbering.
-    period = m_value - 1
+    parsed["period"] -= 1
+    return parsed
 
-    return (segment, round_num, period)
+
+def parse_market_period_annotation(annotation) -> tuple | None:
+    """Parse one annotation into (segment, round, period); None if not a MarketPeriod."""
+    parsed = parse_market_period_annotations(pd.Series([annotation]))
+    return next(parsed.itertuples(index=False, name=None), None)
 
 
 # =====
@@ -184,29 +200,21 @@ def parse_market_period_annotation(annotation) -> tuple | None:
 # =====
 def aggregate_emotions(
     market_df: pd.DataFrame, session_id: str, player_label: str
-) -> list[dict]:
+) -> pd.DataFrame:
     """Aggregate emotion columns to period-level means."""
-    records = []
-    grouped = market_df.groupby(["segment", "round", "period"])
-
-    for (segment, round_num, period), group in grouped:
-        record = {
-            "session_id": session_id,
-            "segment": segment,
-            "round": round_num,
-            "period": period,
-            "player": player_label,
-        }
-
-        # Compute mean of each emotion column (ignoring NaN)
-        for col in EMOTION_COLS:
-            numeric_vals = pd.to_numeric(group[col], errors="coerce")
-            record[f"{col.lower()}_mean"] = numeric_vals.mean()
-
-        record["n_frames"] = len(group)
-        records.append(record)
-
-    return records
+    keys = ["segment", "round", "period"]
+    emotions = market_df[EMOTION_COLS].apply(pd.to_numeric, errors="coerce")
+    grouped = emotions.groupby([market_df[key] for key in keys])
+
+    # Mean of each emotion column (ignoring NaN); n_frames counts all rows
+    period_df = grouped.mean()
+    period_df.columns = [f"{col.lower()}_mean" for col in EMOTION_COLS]
+    period_df["n_frames"] = grouped.size()
+
+    period_df = period_df.reset_index()
+    period_df.insert(0, "session_id", session_id)
+    period_df.insert(len(keys) + 1, "player", player_label)
+    return period_df
 
 
 # =====
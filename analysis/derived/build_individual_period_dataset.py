@@ -42,6 +42,11 @@ DATA STRUCTURE:
 import pandas as pd
 from pathlib import Path
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # =====
 # File paths
 # =====
@@ -60,6 +65,19 @@ SESSIONS = {
 }
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
+GROUP_ROUND_KEYS = ["group.id_in_subsession", "player.round_number_in_segment"]
+
+# Keys, sold flag and per-period values copied into player-period records
+SEGMENT_COLS = [
+    "participant.label",
+    "group.id_in_subsession",
+    "player.round_number_in_segment",
+    "player.period_in_round",
+    "player.state",
+    "player.sold",
+    "player.signal",
+    "player.price",
+]
 
 
 # =====
@@ -67,16 +85,17 @@ SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
 # =====
 def main():
     """Build the individual period dataset."""
-    all_records = []
+    frames = []
 
     print("Processing sessions...")
-    for session_name, treatment in SESSIONS.items():
+    results = map_sessions(process_session, SESSIONS.keys(), SESSIONS.values())
+    for (session_name, treatment), session_df in zip(SESSIONS.items(), results):
         print(f"  {session_name} (treatment {treatment})")
-        records = process_session(session_name, treatment)
-        all_records.extend(records)
-        print(f"    -> {len(records)} player-period observations")
+        frames.append(session_df)
+        print(f"    -> {len(session_df)} player-period observations")
 
-    df = pd.DataFrame(all_records)
+    # Combine per-session DataFrames
+    df = pd.concat(frames, ignore_index=True)
     print_summary_statistics(df)
     save_dataset(df)
 
@@ -86,10 +105,10 @@ def main():
 # =====
 # Session processing
 # =====
-def process_session(session_name: str, treatment: str) -> list[dict]:
-    """Process all segments for a session, return list of player-period records."""
+def process_session(session_name: str, treatment: str) -> pd.DataFrame:
+    """Process all segments for a session, return DataFrame of player-period records."""
     session_folder = DATASTORE / session_name
-    records = []
+    frames = []
 
     for segment_idx, segment in enumerate(SEGMENTS, start=1):
         try:
@@ -98,12 +117,11 @@ def process_session(session_name: str, treatment: str) -> list[dict]:
             print(f"    Warning: {e}")
             continue
 
-        segment_records = process_segment(
-            df, session_name, segment_idx, treatment
-        )
-        records.extend(segment_records)
+        frames.append(process_segment(df, session_name, segment_idx, treatment))
 
-    return records
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
 
 def process_segment(
@@ -111,26 +129,9 @@ def process_segment(
     session_name: str,
     segment_idx: int,
     treatment: str
-) -> list[dict]:
+) -> pd.DataFrame:
     """Process all group-rounds in a segment."""
-    records = []
-
-    group_rounds = df.groupby(
-        ["group.id_in_subsession", "player.round_number_in_segment"]
-    )
-
-    for (group_id, round_num), group_df in group_rounds:
-        round_records = process_group_round(
-            group_df,
-            session_name,
-            segment_idx,
-            int(group_id),
-            int(round_num),
-            treatment
-        )
-        records.extend(round_records)
-
-    return records
+    return build_period_records(df, session_name, segment_idx, treatment)
 
 
 # =====
@@ -138,152 +139,107 @@ def process_segment(
 # =====
 def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
     """Load segment CSV file from session folder."""
-    csv_files = list(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
     if not csv_files:
         raise FileNotFoundError(f"No CSV found for {segment} in {session_folder}")
-    return pd.read_csv(csv_files[0])
+    df = pd.read_csv(csv_files[0], usecols=SEGMENT_COLS)
+    # A blank sold flag means no sale yet; store ints so compute_period_flags
+    # sees a clean 0/1 column
+    df["player.sold"] = df["player.sold"].fillna(0).astype(int)
+    return df
 
 
 # =====
 # Core processing logic
 # =====
-def process_group_round(
-    group_df: pd.DataFrame,
+def build_period_records(
+    df: pd.DataFrame,
     session_name: str,
     segment_idx: int,
-    group_id: int,
-    round_num: int,
     treatment: str
-) -> list[dict]:
+) -> pd.DataFrame:
     """
-    Process a single group-round and return player-period records.
+    Build player-period records for every group-round in df at once.
 
     Core logic:
     - sold: 1 if player sold in THIS specific period (transition from 0 to 1)
     - already_sold: 1 if player sold in any prior period of this round
     - prior_group_sales: count of OTHER group members who sold before this period
-    """
-    records = []
-
-    # Get unique periods and players
-    periods = sorted(group_df["player.period_in_round"].unique())
-    players = group_df["participant.label"].unique()
-
-    # Build lookup: (player, period) -> sold_cumulative value
-    sold_lookup = build_sold_lookup(group_df)
-
-    # Get state (same for all players in round)
-    state = int(group_df["player.state"].iloc[0])
-
-    for period in periods:
-        # Calculate prior_group_sales for this period
-        prior_sales = calc_prior_group_sales(sold_lookup, players, period)
 
-        for player in players:
-            record = build_player_period_record(
-                group_df, sold_lookup, session_name, segment_idx,
-                round_num, period, group_id, player, treatment, state, prior_sales
-            )
-            records.append(record)
-
-    return records
+    Records are ordered by group, round, period, then player in order of
+    first appearance within the group-round. Rows missing a group or round
+    key are skipped, as the per-group-round groupby used to do.
+    """
+    ordered = order_player_periods(df.dropna(subset=GROUP_ROUND_KEYS))
+    flags = compute_period_flags(ordered)
 
+    # State is constant within a group-round; take it from the first row
+    state = ordered.groupby(GROUP_ROUND_KEYS, sort=False)[
+        "player.state"
+    ].transform("first")
 
-def build_sold_lookup(group_df: pd.DataFrame) -> dict:
-    """Build a lookup dict mapping (player, period) -> cumulative sold value."""
-    lookup = {}
-    for _, row in group_df.iterrows():
-        player = row["participant.label"]
-        period = int(row["player.period_in_round"])
-        sold_val = int(row["player.sold"]) if pd.notna(row["player.sold"]) else 0
-        lookup[(player, period)] = sold_val
-    return lookup
+    return pd.DataFrame({
+        "session_id": session_name,
+        "segment": segment_idx,
+        "round": ordered["player.round_number_in_segment"].astype(int),
+        "period": ordered["player.period_in_round"],
+        "group_id": ordered["group.id_in_subsession"].astype(int),
+        "player": ordered["participant.label"],
+        "treatment": treatment,
+        "signal": ordered["player.signal"],
+        "state": state.astype(int),
+        "price": ordered["player.price"],
+        "sold": flags["sold"],
+        "already_sold": flags["already_sold"],
+        "prior_group_sales": flags["prior_group_sales"],
+    })
+
+
+def order_player_periods(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort rows by group, round, period, then player first-appearance order."""
+    player_order = df.groupby(
+        GROUP_ROUND_KEYS + ["participant.label"], sort=False
+    ).ngroup()
+    return df.assign(_player_order=player_order).sort_values(
+        GROUP_ROUND_KEYS + ["player.period_in_round", "_player_order"],
+        kind="stable",
+    )
 
 
-def calc_prior_group_sales(
-    sold_lookup: dict,
-    players,
-    current_period: int
-) -> dict:
+def compute_period_flags(ordered: pd.DataFrame) -> pd.DataFrame:
     """
-    Calculate prior group sales for each player at a given period.
+    Compute sold, already_sold and prior_group_sales for period-ordered rows.
 
-    Returns dict mapping player -> count of OTHER players who sold
-    in periods strictly BEFORE current_period.
+    player.sold is the cumulative oTree flag; anything other than 1 (including
+    NaN) counts as not sold.
     """
-    # Count how many OTHER players sold before this period
-    prior_sales = {}
-
-    for player in players:
-        count = 0
-        for other_player in players:
-            if other_player == player:
-                continue
-            # Check if other_player sold before current_period
-            for p in range(1, current_period):
-                if sold_lookup.get((other_player, p), 0) == 1:
-                    count += 1
-                    break  # Only count each player once
-        prior_sales[player] = count
-
-    return prior_sales
-
-
-def build_player_period_record(
-    group_df: pd.DataFrame,
-    sold_lookup: dict,
-    session_name: str,
-    segment_idx: int,
-    round_num: int,
-    period: int,
-    group_id: int,
-    player: str,
-    treatment: str,
-    state: int,
-    prior_sales: dict
-) -> dict:
-    """Build a single player-period record."""
-    # Get current sold value
-    current_sold = sold_lookup.get((player, period), 0)
-
-    # Determine if sold THIS period (transition from 0 to 1)
-    if period == 1:
-        sold_this_period = current_sold
-    else:
-        prev_sold = sold_lookup.get((player, period - 1), 0)
-        sold_this_period = 1 if (current_sold == 1 and prev_sold == 0) else 0
-
-    # Determine if already_sold (sold in any prior period)
-    already_sold = 0
-    for p in range(1, period):
-        if sold_lookup.get((player, p), 0) == 1:
-            already_sold = 1
-            break
-
-    # Get signal and price from group_df
-    player_period_row = group_df[
-        (group_df["participant.label"] == player) &
-        (group_df["player.period_in_round"] == period)
-    ].iloc[0]
-
-    signal = player_period_row["player.signal"]
-    price = player_period_row["player.price"]
-
-    return {
-        "session_id": session_name,
-        "segment": segment_idx,
-        "round": round_num,
-        "period": period,
-        "group_id": group_id,
-        "player": player,
-        "treatment": treatment,
-        "signal": signal,
-        "state": state,
-        "price": price,
-        "sold": sold_this_period,
+    player_keys = [
+        ordered[key] for key in GROUP_ROUND_KEYS + ["participant.label"]
+    ]
+    has_sold = (ordered["player.sold"] == 1).astype(int)
+
+    # Sold this period: cumulative flag is 1 now but was 0 in the prior period
+    prev_sold = has_sold.groupby(player_keys).shift(1, fill_value=0)
+    sold = ((has_sold == 1) & (prev_sold == 0)).astype(int)
+
+    # Already sold: flag was 1 in any strictly earlier period
+    already_sold = has_sold.groupby(player_keys).cummax().groupby(
+        player_keys
+    ).shift(1, fill_value=0)
+
+    # Other group members who sold before this period (excludes self)
+    period_keys = [
+        ordered[key] for key in GROUP_ROUND_KEYS + ["player.period_in_round"]
+    ]
+    prior_group_sales = (
+        already_sold.groupby(period_keys).transform("sum") - already_sold
+    )
+
+    return pd.DataFrame({
+        "sold": sold,
         "already_sold": already_sold,
-        "prior_group_sales": prior_sales[player],
-    }
+        "prior_group_sales": prior_group_sales,
+    })
 
 
 # =====
@@ -8,9 +8,15 @@ Adds two columns to the individual period dataset:
     - sold_in_round: Whether player sold at any point in the round (0 or 1)
 """
 
+import re
 from pathlib import Path
 import pandas as pd
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # FILE PATHS
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DATASTORE = PROJECT_ROOT / "datastore"
@@ -29,6 +35,14 @@ SESSIONS = {
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
 
+# Raw oTree columns needed to locate each round's payoff
+PAYOFF_KEY_COLS = [
+    "participant.label",
+    "player.round_number_in_segment",
+    "player.period_in_round",
+]
+PAYOFF_COL_REGEX = re.compile(r"player\.round_\d+_payoff")
+
 
 # =====
 # Main function
@@ -62,16 +76,12 @@ def add_sold_in_round(df: pd.DataFrame) -> pd.DataFrame:
     group_cols = ["session_id", "segment", "round", "player"]
 
     # sold=1 OR already_sold=1 means player sold at some point
-    df["_sold_ever"] = (df["sold"] == 1) | (df["already_sold"] == 1)
-
-    # Get max of _sold_ever for each round (1 if sold anytime, 0 otherwise)
-    sold_by_round = df.groupby(group_cols)["_sold_ever"].max().reset_index()
-    sold_by_round["sold_in_round"] = sold_by_round["_sold_ever"].astype(int)
-    sold_by_round = sold_by_round.drop(columns=["_sold_ever"])
+    sold_ever = ((df["sold"] == 1) | (df["already_sold"] == 1)).astype(int)
 
-    # Merge back to original dataframe
-    df = df.drop(columns=["_sold_ever"])
-    df = df.merge(sold_by_round, on=group_cols, how="left")
+    # Broadcast the round max back to every period (1 if sold anytime)
+    df = df.assign(
+        sold_in_round=sold_ever.groupby([df[col] for col in group_cols]).transform("max")
+    )
 
     print(f"  Added sold_in_round: {df['sold_in_round'].sum()} player-periods with sale")
     return df
@@ -82,18 +92,25 @@ def add_sold_in_round(df: pd.DataFrame) -> pd.DataFrame:
 # =====
 def load_all_round_payoffs() -> pd.DataFrame:
     """Load round payoffs from all sessions and segments."""
-    all_payoffs = []
-
     print("Loading round payoffs from raw data...")
-    for session_name in SESSIONS:
-        for segment_idx, segment in enumerate(SEGMENTS, start=1):
-            payoffs = load_segment_payoffs(session_name, segment_idx, segment)
-            if payoffs is not None:
-                all_payoffs.append(payoffs)
+    session_payoffs = map_sessions(load_session_payoffs, SESSIONS)
 
+    all_payoffs = [
+        payoffs for segments in session_payoffs for payoffs in segments
+    ]
     return pd.concat(all_payoffs, ignore_index=True)
 
 
+def load_session_payoffs(session_name: str) -> list[pd.DataFrame]:
+    """Load round payoffs for every segment of one session."""
+    all_payoffs = []
+    for segment_idx, segment in enumerate(SEGMENTS, start=1):
+        payoffs = load_segment_payoffs(session_name, segment_idx, segment)
+        if payoffs is not None:
+            all_payoffs.append(payoffs)
+    return all_payoffs
+
+
 def load_segment_payoffs(
     session_name: str, segment_idx: int, segment: str
 ) -> pd.DataFrame:
@@ -103,13 +120,13 @@ def load_segment_payoffs(
     Returns DataFrame with: session_id, segment, round, player, round_payoff
     """
     session_folder = DATASTORE / session_name
-    csv_files = list(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
 
     if not csv_files:
         print(f"    Warning: No CSV found for {segment} in {session_folder}")
         return None
 
-    df = pd.read_csv(csv_files[0])
+    df = pd.read_csv(csv_files[0], usecols=is_payoff_source_col)
     return extract_round_payoffs(df, session_name, segment_idx)
 
 
@@ -122,47 +139,44 @@ def extract_round_payoffs(
     For each (player, round), get the payoff from player.round_N_payoff column
     at the last period of that round. The payoff value is only correct during
     the round itself, so we must filter to rows for that specific round.
+    Missing rounds, columns or values give a payoff of 0.0.
     """
+    keys = ["participant.label", "player.round_number_in_segment"]
     players = df["participant.label"].unique()
     rounds = df["player.round_number_in_segment"].unique()
-    records = []
-
-    for player in players:
-        player_df = df[df["participant.label"] == player]
-        for round_num in rounds:
-            payoff = get_payoff_for_round(player_df, int(round_num))
-            records.append({
-                "session_id": session_name,
-                "segment": segment_idx,
-                "round": int(round_num),
-                "player": player,
-                "round_payoff": payoff,
-            })
-
-    return pd.DataFrame(records)
-
-
-def get_payoff_for_round(player_df: pd.DataFrame, round_num: int) -> float:
-    """
-    Get the payoff for a specific round.
-
-    Filter to rows for that round, then get the payoff value from the last
-    period (max period_in_round). The payoff column is player.round_N_payoff.
-    """
-    round_df = player_df[player_df["player.round_number_in_segment"] == round_num]
-    if round_df.empty:
-        return 0.0
-
-    # Get the last period in this round
-    last_period_df = round_df[
-        round_df["player.period_in_round"] == round_df["player.period_in_round"].max()
-    ]
 
-    payoff_col = f"player.round_{round_num}_payoff"
-    if payoff_col in last_period_df.columns:
-        value = last_period_df[payoff_col].iloc[0]
-        return float(value) if pd.notna(value) else 0.0
-    return 0.0
+    # Keep the first row at the last period of each (player, round)
+    last_period = df.groupby(keys)["player.period_in_round"].transform("max")
+    last_df = df[df["player.period_in_round"] == last_period].drop_duplicates(keys)
+
+    # Reshape payoff columns long and keep each round's own column
+    payoff_cols = [col for col in df.columns if PAYOFF_COL_REGEX.fullmatch(col)]
+    long_df = last_df.melt(
+        id_vars=keys, value_vars=payoff_cols,
+        var_name="payoff_col", value_name="round_payoff",
+    )
+    own_col = (
+        "player.round_"
+        + long_df["player.round_number_in_segment"].astype(int).astype(str)
+        + "_payoff"
+    )
+    payoffs = long_df[long_df["payoff_col"] == own_col].set_index(keys)["round_payoff"]
+
+    grid = pd.MultiIndex.from_product([players, rounds], names=keys)
+    payoffs = payoffs.reindex(grid).fillna(0.0).astype(float)
+
+    return pd.DataFrame({
+        "session_id": session_name,
+        "segment": segment_idx,
+        "round": grid.get_level_values(1).astype(int),
+        "player": grid.get_level_values(0),
+        "round_payoff": payoffs.to_numpy(),
+    })
+
+
+def is_payoff_source_col(col: str) -> bool:
+    """Return True for raw columns used to extract round payoffs."""
+    return col in PAYOFF_KEY_COLS or bool(PAYOFF_COL_REGEX.fullmatch(col))
 
 
 # =====
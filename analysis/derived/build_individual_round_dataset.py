@@ -24,9 +24,15 @@ DATA STRUCTURE:
     - Expected total: ~2880 observations
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+try:
+    from .session_files import find_segment_csvs, map_sessions
+except ImportError:  # run as a script: python analysis/derived/<builder>.py
+    from session_files import find_segment_csvs, map_sessions
+
 # =====
 # File paths
 # =====
@@ -45,6 +51,7 @@ SESSIONS = {
 }
 
 SEGMENTS = ["chat_noavg", "chat_noavg2", "chat_noavg3", "chat_noavg4"]
+GROUP_ROUND_KEYS = ["group.id_in_subsession", "player.round_number_in_segment"]
 
 
 # =====
@@ -55,9 +62,9 @@ def main():
     all_records = []
 
     print("Processing sessions...")
-    for session_name, treatment in SESSIONS.items():
+    results = map_sessions(process_session, SESSIONS.keys(), SESSIONS.values())
+    for (session_name, treatment), records in zip(SESSIONS.items(), results):
         print(f"  {session_name} (treatment {treatment})")
-        records = process_session(session_name, treatment)
         all_records.extend(records)
         print(f"    -> {len(records)} player-round observations")
 
@@ -95,17 +102,28 @@ def process_segment(
     segment_idx: int,
     treatment: str
 ) -> list[dict]:
-    """Process all group-rounds in a segment."""
+    """
+    Process all group-rounds in a segment.
+
+    Sorts once by (group, round) and hands contiguous row blocks to
+    process_group_round instead of iterating a pandas group object.
+    """
     records = []
 
-    group_rounds = df.groupby(
-        ["group.id_in_subsession", "player.round_number_in_segment"]
-    )
+    # groupby dropped rows with missing keys; NaN != NaN would split them here
+    df = df.dropna(subset=GROUP_ROUND_KEYS)
+    if df.empty:
+        return records
+
+    sorted_df = df.sort_values(GROUP_ROUND_KEYS, kind="stable")
+    keys = sorted_df[GROUP_ROUND_KEYS].to_numpy()
+    starts = np.flatnonzero((keys[1:] != keys[:-1]).any(axis=1)) + 1
 
-    for (group_id, round_num), group_df in group_rounds:
+    for start, stop in zip(np.r_[0, starts], np.r_[starts, len(keys)]):
+        group_id, round_num = keys[start]
         round_records = process_group_round(
-            group_df, session_name, segment_idx, int(group_id),
-            int(round_num), treatment
+            sorted_df.iloc[start:stop], session_name, segment_idx,
+            int(group_id), int(round_num), treatment
         )
         records.extend(round_records)
 
@@ -117,7 +135,7 @@ def process_segment(
 # =====
 def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
     """Load segment CSV file from session folder."""
-    csv_files = sorted(session_folder.glob(f"{segment}_*.csv"))
+    csv_files = find_segment_csvs(session_folder, segment)
     if not csv_files:
         raise FileNotFoundError(f"No CSV found for {segment} in {session_folder}")
     if len(csv_files) > 1:
@@ -125,7 +143,10 @@ def load_segment_data(session_folder: Path, segment: str) -> pd.DataFrame:
             f"Multiple CSVs found for {segment} in {session_folder}: "
             f"{[f.name for f in csv_files]}. Expected exactly one."
         )
-    return pd.read_csv(csv_files[0])
+    df = pd.read_csv(csv_files[0])
+    # A blank sold flag means the player still holds the asset
+    df["player.sold"] = df["player.sold"].fillna(0).astype(int)
+    return df
 
 
 # =====
@@ -141,13 +162,13 @@ def process_group_round(
 ) -> list[dict]:
     """Process a single group-round and return player-round records."""
     records = []
-    players = group_df["participant.label"].unique()
 
     # Get state (same for all players in round)
     state = int(group_df["player.state"].iloc[0])
 
-    for player in players:
-        player_df = group_df[group_df["participant.label"] == player]
+    # Split rows by player once, in order of first appearance
+    by_player = group_df.groupby("participant.label", sort=False)
+    for player, player_df in by_player:
         record = build_player_round_record(
             player_df, session_name, segment_idx, group_id,
             round_num, player, treatment, state
@@ -193,18 +214,16 @@ def get_player_sell_info(player_df: pd.DataFrame) -> tuple:
         (sell_period, sell_price, signal_at_sale) - all None if never sold
     """
     sorted_df = player_df.sort_values("player.period_in_round")
-    prev_sold = 0
-
-    for _, row in sorted_df.iterrows():
-        current_sold = int(row["player.sold"]) if pd.notna(row["player.sold"]) else 0
-        if current_sold == 1 and prev_sold == 0:
-            period = int(row["player.period_in_round"])
-            price = row["player.price"]
-            signal = row["player.signal"]
-            return (period, price, signal)
-        prev_sold = current_sold
-
-    return (None, None, None)
+    sold = sorted_df["player.sold"].to_numpy() == 1
+
+    # The first sold == 1 row is by definition the 0 -> 1 transition
+    if not sold.any():
+        return (None, None, None)
+    first_idx = int(np.argmax(sold))
+    period = int(sorted_df["player.period_in_round"].iat[first_idx])
+    price = sorted_df["player.price"].iat[first_idx]
+    signal = sorted_df["player.signal"].iat[first_idx]
+    return (period, price, signal)
 
 
 # =====
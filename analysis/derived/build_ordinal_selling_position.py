@@ -78,7 +78,7 @@ def compute_selling_ranks(df: pd.DataFrame) -> pd.DataFrame:
     df["sell_rank"] = 4  # Default: non-sellers get rank 4
 
     sellers_mask = df["did_sell"] == 1
-    sellers = df.loc[sellers_mask].copy()
+    sellers = df.loc[sellers_mask]  # read-only subset, no copy needed
 
     ranked = sellers.groupby(GROUP_ROUND_KEYS)["sell_period"].rank(
         method="min"
@@ -58,6 +58,14 @@ LIKERT_4 = {
     "Very much": 4,
 }
 
+# Survey fields a participant must have answered to be scored
+REQUIRED_SURVEY_COLS = [f"player.q{i}" for i in range(1, 25)] + ["player.allocate"]
+
+# Columns read by extract_participant_traits (adds label, age and gender)
+TRAIT_SOURCE_COLS = (
+    ["participant.label"] + REQUIRED_SURVEY_COLS + ["player.q25", "player.q26"]
+)
+
 
 # =====
 # Main function
@@ -92,26 +100,23 @@ def process_session(session_id: str) -> list[dict]:
         return []
 
     df = pd.read_csv(csv_files[0])
-    records = []
-    for _, row in df.iterrows():
-        if has_missing_survey_data(row):
-            label = row["participant.label"]
-            print(f"    Warning: Skipping {label} (missing survey responses)")
-            continue
-        record = extract_participant_traits(row, session_id)
-        records.append(record)
+    missing = find_missing_survey_rows(df)
+    if missing.any():
+        print("\n".join(
+            f"    Warning: Skipping {label} (missing survey responses)"
+            for label in df.loc[missing, "participant.label"].to_numpy()
+        ))
 
-    return records
+    rows = df.loc[~missing, TRAIT_SOURCE_COLS].to_dict("records")
+    return [extract_participant_traits(row, session_id) for row in rows]
 
 
-def has_missing_survey_data(row: pd.Series) -> bool:
-    """Check if any required survey field (q1-q24, allocate) is missing."""
-    if any(pd.isna(row[f"player.q{i}"]) for i in range(1, 25)):
-        return True
-    return pd.isna(row["player.allocate"])
+def find_missing_survey_rows(df: pd.DataFrame) -> pd.Series:
+    """Flag rows missing any required survey field (q1-q24, allocate)."""
+    return df[REQUIRED_SURVEY_COLS].isna().any(axis=1)
 
 
-def extract_participant_traits(row: pd.Series, session_id: str) -> dict:
+def extract_participant_traits(row: dict | pd.Series, session_id: str) -> dict:
     """Extract all trait scores and demographics from a single participant row."""
     return {
         "session_id": session_id,
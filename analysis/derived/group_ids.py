@@ -0,0 +1,31 @@
+"""
+Purpose: Build global group identifiers for derived datasets
+Author: Claude Code
+Date: 2026-10-17
+
+Groups are numbered 1-4 within each session and segment, so derived
+datasets label them "<session>_<segment>_<group>" to make them unique.
+"""
+
+import numpy as np
+import pandas as pd
+
+GROUP_ID_KEYS = ["session_id", "segment", "group_id"]
+
+
+def format_global_group_ids(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return the "<session>_<segment>_<group>" label for every row of df.
+
+    Each distinct (session, segment, group) is formatted once and broadcast
+    back by integer group code. ngroup(sort=False, dropna=False) numbers
+    groups in first-appearance order, which is the order drop_duplicates
+    keeps, so codes index straight into the labels (missing keys included).
+    """
+    codes = df.groupby(GROUP_ID_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+    labels = np.array([
+        f"{session}_{segment}_{group}"
+        for session, segment, group
+        in df[GROUP_ID_KEYS].drop_duplicates().itertuples(index=False)
+    ], dtype=object)
+    return labels[codes]
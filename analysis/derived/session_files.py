@@ -0,0 +1,41 @@
+"""
+Purpose: Session-level helpers shared by the segment builders
+Author: Claude Code
+Date: 2026-10-17
+
+Locates raw oTree segment CSVs inside session folders (each folder is
+globbed once per process) and fans per-session work out to processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+@lru_cache(maxsize=None)
+def list_session_csvs(session_folder: Path) -> tuple[Path, ...]:
+    """List a session folder's CSVs once, sorted by name."""
+    return tuple(sorted(session_folder.glob("*.csv")))
+
+
+def find_segment_csvs(session_folder: Path, segment: str) -> list[Path]:
+    """Return the session's CSVs for one segment ("<segment>_<date>.csv")."""
+    return [
+        f for f in list_session_csvs(session_folder)
+        if f.name.startswith(f"{segment}_")
+    ]
+
+
+def map_sessions(func: Callable, *iterables: Iterable) -> list:
+    """
+    Apply func to each session's arguments, one worker process per session.
+
+    Sessions share no state, so they parallelize cleanly. Results are
+    returned in input order, as with the builtin map.
+    """
+    arg_lists = [list(args) for args in iterables]
+    if not arg_lists[0]:
+        return []
+    with ProcessPoolExecutor(max_workers=len(arg_lists[0])) as executor:
+        return list(executor.map(func, *arg_lists))
@@ -427,6 +427,12 @@ class MarketRunsExperiment:
         
         for session in self.sessions:
             for segment_name, segment in session.segments.items():
+                # Resolve each player's group once per segment, not per row
+                label_to_group_id = {
+                    label: group.group_id
+                    for group in segment.groups.values()
+                    for label in group.player_labels
+                }
                 for round_num, round_obj in segment.rounds.items():
                     
                     if level == 'round':
@@ -448,7 +454,7 @@ class MarketRunsExperiment:
                                     'round_payoff': round_obj.round_payoffs.get(label),
                                     'total_sellers_in_round': round_obj.total_sellers,
                                     'n_periods': round_obj.n_periods,
-                                    'group_id': segment.get_group_by_player(label).group_id if segment.get_group_by_player(label) else None
+                                    'group_id': label_to_group_id.get(label)
                                 })
                     
                     else:  # period level (default)
@@ -470,7 +476,7 @@ class MarketRunsExperiment:
                                     'state': player.state,
                                     'payoff': player.payoff,
                                     'round_payoff': round_obj.round_payoffs.get(label),
-                                    'group_id': segment.get_group_by_player(label).group_id if segment.get_group_by_player(label) else None
+                                    'group_id': label_to_group_id.get(label)
                                 })
         
         return pd.DataFrame(records) if records else pd.DataFrame()
@@ -12,10 +12,9 @@ Tests the first seller identification logic:
 import pandas as pd
 import pytest
 from analysis.derived.build_first_seller_round_dataset import (
-    find_first_sale_info,
-    find_sellers_by_period,
-    get_player_sell_period,
+    NO_FIRST_SALE,
     process_group_round,
+    summarize_first_sales,
 )
 
 
@@ -103,77 +102,45 @@ def create_group_round_df(
     return pd.concat(all_dfs, ignore_index=True)
 
 
+def first_sale_info_for(df: pd.DataFrame) -> dict:
+    """Precompute first sale info for a mock group-round, as process_segment does."""
+    return next(iter(summarize_first_sales(df).values()), NO_FIRST_SALE)
+
+
 # =====
-# Test cases for get_player_sell_period
+# Test cases for a single player's sale
 # =====
 def test_player_never_sold():
-    """Player holds all periods - returns None."""
+    """Player holds all periods - no first sale."""
     player_df = create_player_df(n_periods=4, sell_in_period=None)
-    result = get_player_sell_period(player_df)
-    assert result is None
+    assert summarize_first_sales(player_df) == {}
 
 
 def test_player_sold_period_1():
     """Player sold in period 1."""
     player_df = create_player_df(n_periods=4, sell_in_period=1)
-    result = get_player_sell_period(player_df)
-    assert result == 1
+    assert first_sale_info_for(player_df)["first_sale_period"] == 1
 
 
 def test_player_sold_period_3():
-    """Player sold in period 3."""
+    """Player sold in period 3 (sold stays 1 in period 4)."""
     player_df = create_player_df(n_periods=4, sell_in_period=3)
-    result = get_player_sell_period(player_df)
-    assert result == 3
+    assert first_sale_info_for(player_df)["first_sale_period"] == 3
 
 
 def test_player_sold_last_period():
     """Player sold in the last period."""
     player_df = create_player_df(n_periods=4, sell_in_period=4)
-    result = get_player_sell_period(player_df)
-    assert result == 4
+    assert first_sale_info_for(player_df)["first_sale_period"] == 4
 
 
 # =====
-# Test cases for find_sellers_by_period
-# =====
-def test_no_sellers():
-    """No one sold - returns empty dict."""
-    df = create_group_round_df(n_players=4, n_periods=4, sales_by_player={})
-    result = find_sellers_by_period(df)
-    assert result == {}
-
-
-def test_one_seller():
-    """One player sold."""
-    df = create_group_round_df(n_players=4, sales_by_player={"A": 2})
-    result = find_sellers_by_period(df)
-    assert result == {"A": 2}
-
-
-def test_multiple_sellers_different_periods():
-    """Multiple players sold in different periods."""
-    sales = {"A": 1, "B": 2, "C": 3}
-    df = create_group_round_df(n_players=4, sales_by_player=sales)
-    result = find_sellers_by_period(df)
-    assert result == {"A": 1, "B": 2, "C": 3}
-
-
-def test_all_sellers_same_period():
-    """All players sold in the same period."""
-    sales = {"A": 2, "B": 2, "C": 2, "D": 2}
-    df = create_group_round_df(n_players=4, sales_by_player=sales)
-    result = find_sellers_by_period(df)
-    assert result == sales
-
-
-# =====
-# Test cases for find_first_sale_info
+# Test cases for first sale info in a group-round
 # =====
 def test_first_sale_info_no_sales():
     """No sales - first_sale_period is None, first_sellers is empty."""
     df = create_group_round_df(n_players=4, sales_by_player={})
-    result = find_first_sale_info(df)
+    result = first_sale_info_for(df)
 
     assert result["first_sale_period"] is None
     assert result["public_signal"] is None
@@ -184,18 +151,28 @@ def test_first_sale_info_single_first_seller():
     """One player sells first, others sell later."""
     sales = {"A": 1, "B": 3, "C": 4}  # A sells first
     df = create_group_round_df(n_players=4, sales_by_player=sales, signal=0.67)
-    result = find_first_sale_info(df)
+    result = first_sale_info_for(df)
 
     assert result["first_sale_period"] == 1
     assert result["public_signal"] == 0.67
     assert result["first_sellers"] == {"A"}
 
 
+def test_first_sale_info_later_sellers_excluded():
+    """Players selling after the first sale period are not first sellers."""
+    sales = {"A": 2, "B": 3}
+    df = create_group_round_df(n_players=4, sales_by_player=sales)
+    result = first_sale_info_for(df)
+
+    assert result["first_sale_period"] == 2
+    assert result["first_sellers"] == {"A"}
+
+
 def test_first_sale_info_multiple_first_sellers():
     """Two players sell in the same earliest period."""
     sales = {"A": 2, "B": 2, "C": 4}  # A and B are both first sellers
     df = create_group_round_df(n_players=4, sales_by_player=sales, signal=0.75)
-    result = find_first_sale_info(df)
+    result = first_sale_info_for(df)
 
     assert result["first_sale_period"] == 2
     assert result["public_signal"] == 0.75
@@ -206,13 +183,36 @@ def test_first_sale_info_all_sell_same_period():
     """All four players sell in the same period - all are first sellers."""
     sales = {"A": 3, "B": 3, "C": 3, "D": 3}
     df = create_group_round_df(n_players=4, sales_by_player=sales, signal=0.8)
-    result = find_first_sale_info(df)
+    result = first_sale_info_for(df)
 
     assert result["first_sale_period"] == 3
     assert result["public_signal"] == 0.8
     assert result["first_sellers"] == {"A", "B", "C", "D"}
 
 
+# =====
+# Test cases for summarize_first_sales across a segment
+# =====
+def test_summarize_keys_each_group_round():
+    """Each group-round gets its own entry; rounds without sales are omitted."""
+    round_1 = create_group_round_df(sales_by_player={"A": 2, "B": 2, "C": 3})
+    round_2 = create_group_round_df(sales_by_player={})
+    round_2["player.round_number_in_segment"] = 2
+    round_3 = create_group_round_df(sales_by_player={"D": 1}, signal=0.675)
+    round_3["group.id_in_subsession"] = 2
+    segment_df = pd.concat([round_1, round_2, round_3], ignore_index=True)
+
+    result = summarize_first_sales(segment_df)
+
+    assert set(result) == {(1, 1), (2, 1)}
+    assert result[(1, 1)] == {
+        "first_sale_period": 2, "public_signal": 0.5, "first_sellers": {"A", "B"},
+    }
+    assert result[(2, 1)] == {
+        "first_sale_period": 1, "public_signal": 0.675, "first_sellers": {"D"},
+    }
+
+
 # =====
 # Test cases for process_group_round
 # =====
@@ -221,7 +221,8 @@ def test_output_contains_required_columns():
     df = create_group_round_df(n_players=4, n_periods=4)
     result = process_group_round(
         df, session_name="test_session", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
 
     required_columns = [
@@ -239,7 +240,8 @@ def test_metadata_preserved():
     df = create_group_round_df(n_players=4, n_periods=4)
     result = process_group_round(
         df, session_name="1_11-7-tr1", segment_idx=3,
-        group_id=2, round_num=7, treatment="tr1"
+        group_id=2, round_num=7, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -255,7 +257,8 @@ def test_no_sales_no_first_sellers():
     df = create_group_round_df(n_players=4, n_periods=4, sales_by_player={})
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -270,7 +273,8 @@ def test_single_first_seller_identified():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -293,7 +297,8 @@ def test_multiple_first_sellers_same_period():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -319,7 +324,8 @@ def test_all_players_first_sellers():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -333,7 +339,8 @@ def test_public_signal_captured():
     df = create_group_round_df(n_players=4, sales_by_player=sales, signal=0.675)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -345,7 +352,8 @@ def test_state_captured():
     df = create_group_round_df(n_players=4, state=0)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -358,7 +366,8 @@ def test_one_row_per_player():
     df = create_group_round_df(n_players=4, n_periods=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
 
     # Should have exactly 4 records (one per player)
@@ -375,7 +384,8 @@ def test_later_seller_not_first_seller():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -391,7 +401,8 @@ def test_holder_not_first_seller():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -410,7 +421,8 @@ def test_three_first_sellers():
     df = create_group_round_df(n_players=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -431,7 +443,8 @@ def test_first_sale_in_last_period():
     df = create_group_round_df(n_players=4, n_periods=4, sales_by_player=sales)
     result = process_group_round(
         df, session_name="test", segment_idx=1,
-        group_id=1, round_num=1, treatment="tr1"
+        group_id=1, round_num=1, treatment="tr1",
+        first_sale_info=first_sale_info_for(df)
     )
     result_df = pd.DataFrame(result)
 
@@ -9,6 +9,7 @@ import pandas as pd
 import numpy as np
 from analysis.derived.build_imotions_period_emotions import (
     parse_market_period_annotation,
+    parse_market_period_annotations,
     extract_player_label,
     aggregate_emotions,
     EMOTION_COLS,
@@ -94,6 +95,27 @@ def test_parse_label_returns_none():
     assert parse_market_period_annotation("Label") is None
 
 
+def test_parse_column_keeps_market_period_rows():
+    """Column parser keeps only MarketPeriod rows, with offset and row index."""
+    annotations = pd.Series([
+        "s1r1m1SegmentIntro", "s1r1m2MarketPeriod", float("nan"),
+        "s1r1m2MarketPeriodWait", "s2r5m11MarketPeriod", "", "Survey",
+    ])
+    parsed = parse_market_period_annotations(annotations)
+
+    assert list(parsed.columns) == ["segment", "round", "period"]
+    assert list(parsed.index) == [1, 4]
+    assert [tuple(row) for row in parsed.itertuples(index=False)] == [
+        (1, 1, 1), (2, 5, 10),
+    ]
+
+
+def test_parse_column_no_market_periods():
+    """Column without MarketPeriod rows (even all-NaN) parses to empty."""
+    assert parse_market_period_annotations(pd.Series(["Survey", "Label"])).empty
+    assert parse_market_period_annotations(pd.Series([np.nan, np.nan])).empty
+
+
 # =====
 # Player label extraction tests
 # =====
@@ -240,11 +262,11 @@ def test_aggregate_single_period():
         "Anger": [0.1] * 10,
         "Joy": [0.8] * 10,
     })
-    records = aggregate_emotions(market_df, "test_session", "A")
-    assert len(records) == 1
-    assert records[0]["anger_mean"] == pytest.approx(0.1)
-    assert records[0]["joy_mean"] == pytest.approx(0.8)
-    assert records[0]["n_frames"] == 10
+    result = aggregate_emotions(market_df, "test_session", "A")
+    assert len(result) == 1
+    assert result.iloc[0]["anger_mean"] == pytest.approx(0.1)
+    assert result.iloc[0]["joy_mean"] == pytest.approx(0.8)
+    assert result.iloc[0]["n_frames"] == 10
 
 
 def test_aggregate_varying_values():
@@ -252,8 +274,8 @@ def test_aggregate_varying_values():
     market_df = make_market_df(n_frames=4, emotion_values={
         "Fear": [0.0, 0.2, 0.4, 0.6],
     })
-    records = aggregate_emotions(market_df, "test_session", "B")
-    assert records[0]["fear_mean"] == pytest.approx(0.3)
+    result = aggregate_emotions(market_df, "test_session", "B")
+    assert result.iloc[0]["fear_mean"] == pytest.approx(0.3)
 
 
 def test_aggregate_with_nan():
@@ -261,11 +283,11 @@ def test_aggregate_with_nan():
     market_df = make_market_df(n_frames=4, emotion_values={
         "Sadness": [0.2, float("nan"), 0.4, float("nan")],
     })
-    records = aggregate_emotions(market_df, "test_session", "C")
+    result = aggregate_emotions(market_df, "test_session", "C")
     # Mean of [0.2, 0.4] = 0.3
-    assert records[0]["sadness_mean"] == pytest.approx(0.3)
+    assert result.iloc[0]["sadness_mean"] == pytest.approx(0.3)
     # n_frames counts all rows, including NaN
-    assert records[0]["n_frames"] == 4
+    assert result.iloc[0]["n_frames"] == 4
 
 
 def test_aggregate_multiple_periods():
@@ -274,23 +296,23 @@ def test_aggregate_multiple_periods():
     df2 = make_market_df(n_frames=5, segment=1, round_num=1, period=2)
     market_df = pd.concat([df1, df2], ignore_index=True)
 
-    records = aggregate_emotions(market_df, "test_session", "D")
-    assert len(records) == 2
+    result = aggregate_emotions(market_df, "test_session", "D")
+    assert len(result) == 2
 
     # Check that both periods are present
-    periods = {r["period"] for r in records}
+    periods = set(result["period"])
     assert periods == {1, 2}
 
 
 def test_aggregate_metadata():
     """Session and player metadata is preserved in output."""
     market_df = make_market_df(n_frames=2, segment=3, round_num=7, period=2)
-    records = aggregate_emotions(market_df, "4_11-12-tr1", "K")
-    assert records[0]["session_id"] == "4_11-12-tr1"
-    assert records[0]["player"] == "K"
-    assert records[0]["segment"] == 3
-    assert records[0]["round"] == 7
-    assert records[0]["period"] == 2
+    result = aggregate_emotions(market_df, "4_11-12-tr1", "K")
+    assert result.iloc[0]["session_id"] == "4_11-12-tr1"
+    assert result.iloc[0]["player"] == "K"
+    assert result.iloc[0]["segment"] == 3
+    assert result.iloc[0]["round"] == 7
+    assert result.iloc[0]["period"] == 2
 
 
 def test_aggregate_all_nan_emotion():
@@ -298,8 +320,8 @@ def test_aggregate_all_nan_emotion():
     market_df = make_market_df(n_frames=3, emotion_values={
         "Surprise": [float("nan")] * 3,
     })
-    records = aggregate_emotions(market_df, "test", "A")
-    assert np.isnan(records[0]["surprise_mean"])
+    result = aggregate_emotions(market_df, "test", "A")
+    assert np.isnan(result.iloc[0]["surprise_mean"])
 
 
 # %%
@@ -6,7 +6,7 @@ Date: 2025-01-14
 
 import pandas as pd
 import pytest
-from analysis.derived.build_individual_period_dataset import process_group_round
+from analysis.derived.build_individual_period_dataset import build_period_records
 
 
 # =====
@@ -15,7 +15,9 @@ from analysis.derived.build_individual_period_dataset import process_group_round
 def create_group_round_df(
     n_players: int = 4,
     n_periods: int = 3,
-    sales_by_period: dict = None
+    sales_by_period: dict = None,
+    group_id: int = 1,
+    round_num: int = 1
 ):
     """
     Create a mock group-round DataFrame.
@@ -26,6 +28,8 @@ def create_group_round_df(
         sales_by_period: Dict mapping period -> list of player labels who sell
                         e.g., {1: ['A'], 2: ['B', 'C']} means A sells in p1,
                         B and C sell in p2
+        group_id: Group identifier (default 1)
+        round_num: Round number within segment (default 1)
 
     Returns:
         DataFrame with columns matching raw oTree export structure
@@ -54,27 +58,27 @@ def create_group_round_df(
                 'player.signal': 0.5,
                 'player.state': 1,
                 'player.price': 8 - 2 * (period - 1),
-                'group.id_in_subsession': 1,
+                'group.id_in_subsession': group_id,
+                'player.round_number_in_segment': round_num,
             })
 
     return pd.DataFrame(rows)
 
 
 # =====
-# Test cases for process_group_round
+# Test cases for a single group-round
 # =====
 def test_no_sales():
     """No one sold - all computed fields should be 0."""
     df = create_group_round_df(n_players=4, n_periods=3, sales_by_period={})
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
 
-    assert len(result) == 12  # 4 players * 3 periods
-    assert all(r['sold'] == 0 for r in result)
-    assert all(r['already_sold'] == 0 for r in result)
-    assert all(r['prior_group_sales'] == 0 for r in result)
+    assert len(result_df) == 12  # 4 players * 3 periods
+    assert all(result_df['sold'] == 0)
+    assert all(result_df['already_sold'] == 0)
+    assert all(result_df['prior_group_sales'] == 0)
 
 
 def test_single_sale_period_1():
@@ -82,14 +86,10 @@ def test_single_sale_period_1():
     df = create_group_round_df(
         n_players=4, n_periods=3, sales_by_period={1: ['A']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
 
-    # Convert to DataFrame for easier querying
-    result_df = pd.DataFrame(result)
-
     # Player A in period 1: sold=1, prior_group_sales=0 (no prior periods)
     a_p1 = result_df[
         (result_df['player'] == 'A') & (result_df['period'] == 1)
@@ -110,11 +110,9 @@ def test_single_sale_period_2():
     df = create_group_round_df(
         n_players=4, n_periods=3, sales_by_period={2: ['A']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # Period 1: no one sold yet
     p1 = result_df[result_df['period'] == 1]
@@ -134,11 +132,9 @@ def test_multiple_sales_same_period():
     df = create_group_round_df(
         n_players=4, n_periods=3, sales_by_period={1: ['A', 'B']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # Both A and B have sold=1 in period 1
     ab_p1 = result_df[
@@ -157,11 +153,9 @@ def test_sequential_sales():
     df = create_group_round_df(
         n_players=4, n_periods=3, sales_by_period={1: ['A'], 2: ['B']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # Period 1: A sold, B not yet
     a_p1 = result_df[
@@ -193,11 +187,9 @@ def test_already_sold_tracking():
     df = create_group_round_df(
         n_players=4, n_periods=4, sales_by_period={1: ['A']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # A in period 1: sold=1, already_sold=0 (selling now, not already)
     a_p1 = result_df[
@@ -221,11 +213,9 @@ def test_prior_group_sales_excludes_self():
     df = create_group_round_df(
         n_players=4, n_periods=3, sales_by_period={1: ['A'], 2: ['B']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # In period 2, B should see prior_group_sales=1 (A sold in p1)
     b_p2 = result_df[
@@ -247,11 +237,9 @@ def test_all_players_sell_different_periods():
         n_players=4, n_periods=4,
         sales_by_period={1: ['A'], 2: ['B'], 3: ['C'], 4: ['D']}
     )
-    result = process_group_round(
-        df, session_name='test', segment_idx=1,
-        group_id=1, round_num=1, treatment=1
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     # Period 1: A sells, prior_group_sales=0 for all
     p1 = result_df[result_df['period'] == 1]
@@ -279,10 +267,11 @@ def test_all_players_sell_different_periods():
 
 def test_output_contains_required_columns():
     """Verify output records contain all required columns."""
-    df = create_group_round_df(n_players=4, n_periods=2, sales_by_period={})
-    result = process_group_round(
-        df, session_name='test_session', segment_idx=2,
-        group_id=3, round_num=5, treatment=1
+    df = create_group_round_df(
+        n_players=4, n_periods=2, sales_by_period={}, group_id=3, round_num=5
+    )
+    result_df = build_period_records(
+        df, session_name='test_session', segment_idx=2, treatment=1
     )
 
     required_columns = [
@@ -291,19 +280,19 @@ def test_output_contains_required_columns():
         'prior_group_sales', 'signal', 'state', 'price'
     ]
 
-    assert len(result) > 0
+    assert len(result_df) > 0
     for col in required_columns:
-        assert col in result[0], f"Missing column: {col}"
+        assert col in result_df.columns, f"Missing column: {col}"
 
 
 def test_metadata_preserved():
     """Verify session metadata is preserved in output."""
-    df = create_group_round_df(n_players=4, n_periods=2, sales_by_period={})
-    result = process_group_round(
-        df, session_name='1_11-7-tr1', segment_idx=3,
-        group_id=2, round_num=7, treatment=1
+    df = create_group_round_df(
+        n_players=4, n_periods=2, sales_by_period={}, group_id=2, round_num=7
+    )
+    result_df = build_period_records(
+        df, session_name='1_11-7-tr1', segment_idx=3, treatment=1
     )
-    result_df = pd.DataFrame(result)
 
     assert all(result_df['session_id'] == '1_11-7-tr1')
     assert all(result_df['segment'] == 3)
@@ -312,6 +301,120 @@ def test_metadata_preserved():
     assert all(result_df['treatment'] == 1)
 
 
+# =====
+# Test cases for a whole segment
+# =====
+def create_segment_df():
+    """
+    Two groups x two rounds, stacked round-major as in the raw export.
+
+    Group 1, round 1: A sells p1, C sells p3
+    Group 1, round 2: B sells p2
+    Group 2, round 1: B sells p2 (A-D labels reused for another group)
+    Group 2, round 2: no sales
+    """
+    configs = [
+        (1, 1, {1: ['A'], 3: ['C']}),
+        (2, 1, {2: ['B']}),
+        (1, 2, {2: ['B']}),
+        (2, 2, {}),
+    ]
+    frames = [
+        create_group_round_df(
+            n_players=4, n_periods=3, sales_by_period=sales,
+            group_id=group_id, round_num=round_num
+        )
+        for group_id, round_num, sales in configs
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_row(result_df, group_id, round_num, player, period):
+    """Return the single output row for one player-period."""
+    rows = result_df[
+        (result_df['group_id'] == group_id) &
+        (result_df['round'] == round_num) &
+        (result_df['player'] == player) &
+        (result_df['period'] == period)
+    ]
+    assert len(rows) == 1
+    return rows.iloc[0]
+
+
+def test_segment_record_order():
+    """Records are ordered by group, round, period, then player."""
+    result_df = build_period_records(
+        create_segment_df(), session_name='test', segment_idx=1, treatment=1
+    )
+
+    assert len(result_df) == 48  # 2 groups * 2 rounds * 3 periods * 4 players
+    keys = list(zip(result_df['group_id'], result_df['round']))
+    assert keys == sorted(keys)
+    first_block = result_df.head(12)
+    assert list(first_block['period']) == [1] * 4 + [2] * 4 + [3] * 4
+    assert list(first_block['player']) == ['A', 'B', 'C', 'D'] * 3
+
+
+def test_segment_prior_group_sales_across_players():
+    """Earlier sales by other players count, within the same group-round only."""
+    result_df = build_period_records(
+        create_segment_df(), session_name='test', segment_idx=1, treatment=1
+    )
+
+    # Group 1 round 1: C sells in p3 after A sold in p1
+    c_p3 = get_row(result_df, 1, 1, 'C', 3)
+    assert c_p3['sold'] == 1
+    assert c_p3['already_sold'] == 0
+    assert c_p3['prior_group_sales'] == 1
+    assert get_row(result_df, 1, 1, 'D', 3)['prior_group_sales'] == 1
+    assert get_row(result_df, 1, 1, 'A', 3)['prior_group_sales'] == 0
+
+    # Group 2 round 1 shares labels but not A's sale
+    assert get_row(result_df, 2, 1, 'C', 3)['prior_group_sales'] == 1
+    assert get_row(result_df, 2, 1, 'A', 2)['prior_group_sales'] == 0
+
+
+def test_segment_later_period_sale_and_round_reset():
+    """A later-period sale is flagged once, and flags reset in the next round."""
+    result_df = build_period_records(
+        create_segment_df(), session_name='test', segment_idx=1, treatment=1
+    )
+
+    b_sold = [get_row(result_df, 1, 2, 'B', p)['sold'] for p in (1, 2, 3)]
+    b_already = [
+        get_row(result_df, 1, 2, 'B', p)['already_sold'] for p in (1, 2, 3)
+    ]
+    assert b_sold == [0, 1, 0]
+    assert b_already == [0, 0, 1]
+
+    # A sold in round 1 but starts round 2 unsold
+    a_r2 = result_df[
+        (result_df['group_id'] == 1) & (result_df['round'] == 2) &
+        (result_df['player'] == 'A')
+    ]
+    assert all(a_r2['sold'] == 0)
+    assert all(a_r2['already_sold'] == 0)
+    assert get_row(result_df, 1, 2, 'A', 3)['prior_group_sales'] == 1
+
+    # Group 2 round 2 has no sales at all
+    g2_r2 = result_df[(result_df['group_id'] == 2) & (result_df['round'] == 2)]
+    assert g2_r2[['sold', 'already_sold', 'prior_group_sales']].eq(0).all().all()
+
+
+def test_segment_skips_rows_with_missing_keys():
+    """Rows with a blank group or round are dropped, not cast to int."""
+    stray = create_group_round_df(n_players=1, n_periods=1)
+    stray['group.id_in_subsession'] = float('nan')
+    df = pd.concat([create_segment_df(), stray], ignore_index=True)
+
+    result_df = build_period_records(
+        df, session_name='test', segment_idx=1, treatment=1
+    )
+
+    assert len(result_df) == 48
+    assert result_df['group_id'].notna().all()
+
+
 # %%
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -18,7 +18,10 @@ import pytest
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / "analysis"))
 
-from derived.build_individual_period_dataset_extended import add_sold_in_round
+from derived.build_individual_period_dataset_extended import (
+    add_sold_in_round,
+    extract_round_payoffs,
+)
 
 
 # =====
@@ -392,6 +395,44 @@ class TestOutputStructure:
         )
 
 
+# =====
+# Test raw payoff extraction
+# =====
+class TestExtractRoundPayoffs:
+    """Tests for extract_round_payoffs on raw oTree segment rows."""
+
+    def _raw_df(self):
+        """Two players, round 1 with 2 periods and round 2 with 1 period."""
+        rows = []
+        for player in ['A', 'B']:
+            for round_num, period in [(1, 1), (1, 2), (2, 1)]:
+                rows.append({
+                    'participant.label': player,
+                    'player.round_number_in_segment': round_num,
+                    'player.period_in_round': period,
+                    'player.round_1_payoff': 10 * period if player == 'A' else None,
+                    'player.round_2_payoff': 6,
+                })
+        return pd.DataFrame(rows)
+
+    def test_payoff_from_own_round_column_at_last_period(self):
+        """Round N payoff comes from player.round_N_payoff at the last period."""
+        result = extract_round_payoffs(self._raw_df(), 's1', 1)
+        a = result[result['player'] == 'A'].set_index('round')['round_payoff']
+        assert a[1] == 20.0
+        assert a[2] == 6.0
+
+    def test_missing_payoff_is_zero(self):
+        """NaN payoffs and missing rounds default to 0.0."""
+        df = self._raw_df()
+        df = df[~((df['participant.label'] == 'A') & (df['player.round_number_in_segment'] == 2))]
+        result = extract_round_payoffs(df, 's1', 1).set_index(['player', 'round'])
+
+        assert result.loc[('B', 1), 'round_payoff'] == 0.0
+        assert result.loc[('A', 2), 'round_payoff'] == 0.0
+        assert len(result) == 4
+
+
 # =====
 # Edge cases
 # =====
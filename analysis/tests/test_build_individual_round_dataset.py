@@ -9,6 +9,7 @@ import pytest
 from analysis.derived.build_individual_round_dataset import (
     get_player_sell_info,
     process_group_round,
+    process_segment,
 )
 
 
@@ -293,6 +294,54 @@ def test_one_row_per_player():
     assert len(set(players)) == 4
 
 
+# =====
+# Test cases for process_segment
+# =====
+def create_segment_df():
+    """Two groups x two rounds, rows out of order, plus a row missing its group."""
+    frames = []
+    for group_id, round_num in [(2, 2), (1, 2), (2, 1), (1, 1)]:
+        df = create_group_round_df(
+            n_players=2, n_periods=2,
+            sales_by_player={'A': round_num}, state=group_id % 2
+        )
+        df['group.id_in_subsession'] = group_id
+        df['player.round_number_in_segment'] = round_num
+        frames.append(df)
+
+    stray = create_group_round_df(n_players=1, n_periods=1).assign(
+        **{'group.id_in_subsession': float('nan')}
+    )
+    frames.append(stray)
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_segment_blocks_sorted_by_group_and_round():
+    """Each (group, round) yields one block of player records, in key order."""
+    result = process_segment(
+        create_segment_df(), session_name='test', segment_idx=1,
+        treatment='tr1'
+    )
+    result_df = pd.DataFrame(result)
+
+    keys = list(zip(result_df['group_id'], result_df['round']))
+    assert keys == [(1, 1), (1, 1), (1, 2), (1, 2),
+                    (2, 1), (2, 1), (2, 2), (2, 2)]
+    assert list(result_df['state']) == [1, 1, 1, 1, 0, 0, 0, 0]
+
+    a_rows = result_df[result_df['player'] == 'A']
+    assert list(a_rows['sell_period']) == [1, 2, 1, 2]
+
+
+def test_segment_drops_rows_with_missing_keys():
+    """Rows with a missing group or round are skipped, not processed alone."""
+    result = process_segment(
+        create_segment_df(), session_name='test', segment_idx=1,
+        treatment='tr1'
+    )
+    assert len(result) == 8
+
+
 # %%
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,60 @@
+"""
+Purpose: Unit tests for group_ids.py (global group identifiers)
+Author: Claude Code
+Date: 2026-10-17
+"""
+
+import numpy as np
+import pandas as pd
+from analysis.derived.group_ids import format_global_group_ids
+
+
+# =====
+# format_global_group_ids tests
+# =====
+def test_global_group_id_format():
+    """Label is '<session>_<segment>_<group>'."""
+    df = pd.DataFrame({
+        "session_id": ["1_11-7-tr1"], "segment": [2], "group_id": [3],
+    })
+    assert list(format_global_group_ids(df)) == ["1_11-7-tr1_2_3"]
+
+
+def test_global_group_id_interleaved_rows():
+    """Each row gets its own group's label, whatever the row order."""
+    df = pd.DataFrame({
+        "session_id": ["a", "b", "a", "a", "b"],
+        "segment": [1, 1, 2, 1, 1],
+        "group_id": [1, 1, 1, 2, 1],
+    })
+    expected = [
+        f"{s}_{seg}_{g}"
+        for s, seg, g in zip(df["session_id"], df["segment"], df["group_id"])
+    ]
+    assert list(format_global_group_ids(df)) == expected
+
+
+def test_global_group_id_same_group_across_sessions_distinct():
+    """Same segment and group number in two sessions give two labels."""
+    df = pd.DataFrame({
+        "session_id": ["a", "b"], "segment": [1, 1], "group_id": [1, 1],
+    })
+    assert list(format_global_group_ids(df)) == ["a_1_1", "b_1_1"]
+
+
+def test_global_group_id_missing_keys_stay_aligned():
+    """Rows with a missing key keep their own label, as str(NaN) gives 'nan'."""
+    df = pd.DataFrame({
+        "session_id": ["a", np.nan, "a", np.nan, "b"],
+        "segment": [1, 1, 1, 1, 1],
+        "group_id": [1, 1, 2, 1, 1],
+    })
+    assert list(format_global_group_ids(df)) == [
+        "a_1_1", "nan_1_1", "a_1_2", "nan_1_1", "b_1_1",
+    ]
+
+
+def test_global_group_id_one_per_row():
+    """Output has one label per input row, empty frame included."""
+    df = pd.DataFrame({"session_id": [], "segment": [], "group_id": []})
+    assert len(format_global_group_ids(df)) == 0
@@ -0,0 +1,101 @@
+"""
+Purpose: Unit tests for session_files.py (segment CSV lookup and session fan-out)
+Author: Claude Code
+Date: 2026-10-17
+"""
+
+import operator
+
+import pytest
+from analysis.derived.session_files import (
+    find_segment_csvs,
+    list_session_csvs,
+    map_sessions,
+)
+
+
+# =====
+# Fixtures
+# =====
+@pytest.fixture
+def session_folder(tmp_path):
+    """Session folder with segment CSVs plus files that must be ignored."""
+    for name in [
+        "chat_noavg_2025-11-07.csv",
+        "chat_noavg2_2025-11-07.csv",
+        "chat_noavg3_2025-11-07.csv",
+        "quiz_2025-11-07.csv",
+        "chat_noavg_notes.txt",
+    ]:
+        (tmp_path / name).write_text("")
+    list_session_csvs.cache_clear()
+    yield tmp_path
+    list_session_csvs.cache_clear()
+
+
+# =====
+# list_session_csvs tests
+# =====
+def test_list_session_csvs_sorted_csvs_only(session_folder):
+    """Only CSV files are listed, sorted by name."""
+    names = [f.name for f in list_session_csvs(session_folder)]
+    assert names == [
+        "chat_noavg2_2025-11-07.csv",
+        "chat_noavg3_2025-11-07.csv",
+        "chat_noavg_2025-11-07.csv",
+        "quiz_2025-11-07.csv",
+    ]
+
+
+def test_list_session_csvs_cached_until_cleared(session_folder):
+    """Listing is cached per folder; new files appear only after cache_clear."""
+    before = list_session_csvs(session_folder)
+    (session_folder / "chat_noavg4_2025-11-07.csv").write_text("")
+
+    assert list_session_csvs(session_folder) is before
+
+    list_session_csvs.cache_clear()
+    after = list_session_csvs(session_folder)
+    assert len(after) == len(before) + 1
+
+
+# =====
+# find_segment_csvs tests
+# =====
+def test_find_segment_csvs_exact_segment_prefix(session_folder):
+    """Segment name must be followed by '_', so chat_noavg skips chat_noavg2."""
+    files = find_segment_csvs(session_folder, "chat_noavg")
+    assert [f.name for f in files] == ["chat_noavg_2025-11-07.csv"]
+
+
+def test_find_segment_csvs_numbered_segment(session_folder):
+    """Numbered segments match only their own file."""
+    files = find_segment_csvs(session_folder, "chat_noavg2")
+    assert [f.name for f in files] == ["chat_noavg2_2025-11-07.csv"]
+
+
+def test_find_segment_csvs_missing_segment(session_folder):
+    """Segment without a CSV returns an empty list."""
+    assert find_segment_csvs(session_folder, "chat_noavg4") == []
+
+
+# =====
+# map_sessions tests
+# =====
+def test_map_sessions_keeps_input_order():
+    """Results come back in input order, like the builtin map."""
+    bases = [5, 1, 4, 2, 3]
+    offsets = [10, 20, 30, 40, 50]
+    assert map_sessions(operator.add, bases, offsets) == list(
+        map(operator.add, bases, offsets)
+    )
+
+
+def test_map_sessions_accepts_iterators():
+    """One-shot iterators are materialized before fan-out."""
+    assert map_sessions(operator.neg, iter([1, 2, 3])) == [-1, -2, -3]
+
+
+def test_map_sessions_no_sessions():
+    """No sessions returns an empty list without starting a pool."""
+    assert map_sessions(operator.add, [], []) == []